@@ -2,6 +2,6 @@
 Commodities Observer Application
 """
 # Import models to ensure they are registered with SQLAlchemy
-from app.models.models import Alert, PriceHistory, Candle
+from app.models.models import Alert, PriceHistory, PriceHistoryStats, Candle
 
-__all__ = ["Alert", "PriceHistory", "Candle"]
+__all__ = ["Alert", "PriceHistory", "PriceHistoryStats", "Candle"]
@@ -9,24 +9,6 @@ router = APIRouter()
 @router.post("")
 async def create_alert(request: CreateAlertRequest):
     """Create a new price alert."""
-    if request.condition not in ["above", "below", "equal"]:
-        raise HTTPException(status_code=400, detail="Condition must be 'above', 'below', or 'equal'")
-
-    if not request.channels:
-        raise HTTPException(status_code=400, detail="At least one channel (email or sms) must be selected")
-
-    invalid_channels = set(request.channels) - {"email", "sms"}
-    if invalid_channels:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid channels: {invalid_channels}. Must be 'email' or 'sms'",
-        )
-
-    if "email" in request.channels and not request.email:
-        raise HTTPException(status_code=400, detail="Email is required for email alerts")
-    if "sms" in request.channels and not request.phone:
-        raise HTTPException(status_code=400, detail="Phone is required for SMS alerts")
-
     alert = state.alert_manager.create_alert(
         pair=request.pair,
         target_price=request.target_price,
@@ -43,10 +25,11 @@ async def create_alert(request: CreateAlertRequest):
 async def get_alerts():
     """Get all alerts."""
     all_alerts = state.alert_manager.get_all_alerts()
+    by_status = state.alert_manager.get_alerts_by_status()
     return {
         "total": len(all_alerts),
-        "active": [a for a in all_alerts if a["status"] == "active"],
-        "triggered": [a for a in all_alerts if a["status"] == "triggered"],
+        "active": by_status["active"],
+        "triggered": by_status["triggered"],
         "all": all_alerts,
     }
 
@@ -1,11 +1,11 @@
 import os
 
 from fastapi import APIRouter
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 
 from app.core import state
-from app.core.config import SYMBOLS
-from app.core.paths import CLIENT_HTML_PATH
+from app.core.config import SYMBOLS, WS_ENCODING
+from app.core.paths import CLIENT_HTML_PATH, MSGPACK_DECODER_JS_PATH
 
 router = APIRouter()
 
@@ -16,12 +16,19 @@ async def root():
     return FileResponse(CLIENT_HTML_PATH)
 
 
+@router.get("/msgpack-decode.js")
+async def msgpack_decoder():
+    """Serve the client's MessagePack decoder module."""
+    return FileResponse(MSGPACK_DECODER_JS_PATH, media_type="text/javascript")
+
+
 @router.get("/client-config")
 async def client_config():
     """Serve client runtime configuration derived from environment."""
     ws_url = os.getenv("WS_URL", "ws://localhost:8001/ws/observe")
-    return JSONResponse({
+    return ORJSONResponse({
         "wsUrl": ws_url,
+        "encoding": WS_ENCODING,
     })
 
 
@@ -29,10 +36,10 @@ async def client_config():
 async def snapshot():
     """Get a single snapshot of current commodities data."""
     if not state.observer:
-        return JSONResponse({"error": "Observer not ready"}, status_code=503)
+        return ORJSONResponse({"error": "Observer not ready"}, status_code=503)
 
     try:
         data = await state.observer.snapshot(SYMBOLS)
-        return JSONResponse(data)
+        return ORJSONResponse(data)
     except Exception:
-        return JSONResponse({"error": "Failed to get snapshot"}, status_code=500)
+        return ORJSONResponse({"error": "Failed to get snapshot"}, status_code=500)
@@ -1,16 +1,20 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
 
 from app.core import state
+from app.db.database import get_db
 
 router = APIRouter()
 
 
 @router.get("/info")
-async def replay_info():
+async def replay_info(db: Session = Depends(get_db)):
     """Get information about available price history for replay."""
-    date_range = state.price_history.get_date_range()
+    date_range = state.price_history.get_date_range(db=db)
     return {
-        "total_snapshots": state.price_history.get_snapshot_count(),
+        "total_snapshots": state.price_history.get_snapshot_count(db=db),
         "date_range": date_range,
         "status": state.replay_manager.get_status(),
     }
@@ -20,20 +24,27 @@ async def replay_info():
 async def start_replay(
     start_index: int = 0,
     speed: float = 1.0,
+    db: Session = Depends(get_db),
 ):
     """Start price replay from a specific snapshot index."""
-    snapshots = state.price_history.get_history_range()
+    if not (0.25 <= speed <= 4.0):
+        raise HTTPException(status_code=400, detail="Speed must be between 0.25 and 4.0")
 
-    if not snapshots:
-        raise HTTPException(status_code=400, detail="No price history available")
+    # Loaded into locals; the running replay is untouched until validation passes
+    timestamps, snapshots = state.replay_manager.load_from_history(state.price_history, db=db)
+    total = len(snapshots)
 
-    if not (0 <= start_index < len(snapshots)):
-        raise HTTPException(status_code=400, detail=f"Invalid start_index. Must be 0-{len(snapshots)-1}")
+    if not total:
+        raise HTTPException(status_code=400, detail="No price history available")
 
-    if not (0.25 <= speed <= 4.0):
-        raise HTTPException(status_code=400, detail="Speed must be between 0.25 and 4.0")
+    if not (0 <= start_index < total):
+        raise HTTPException(status_code=400, detail=f"Invalid start_index. Must be 0-{total-1}")
 
-    status = state.replay_manager.start_replay(snapshots, start_index=start_index, speed=speed)
+    status = state.replay_manager.start_replay(
+        start_index=start_index,
+        speed=speed,
+        columns=(timestamps, snapshots),
+    )
     return status
 
 
@@ -64,12 +75,13 @@ async def set_replay_speed(speed: float):
 
 
 @router.post("/seek")
-async def seek_replay(index: int = 0):
+async def seek_replay(index: int = 0, db: Session = Depends(get_db)):
     """Seek to specific snapshot index."""
-    if not (0 <= index < state.price_history.get_snapshot_count()):
+    total = state.price_history.get_snapshot_count(db=db)
+    if not (0 <= index < total):
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid index. Must be 0-{state.price_history.get_snapshot_count()-1}",
+            detail=f"Invalid index. Must be 0-{total-1}",
         )
     return state.replay_manager.seek_to_index(index)
 
@@ -89,11 +101,27 @@ async def get_replay_status():
 
 
 @router.get("/history")
-async def get_price_history(limit: int = 100):
+async def get_price_history(limit: int = 100, db: Session = Depends(get_db)):
     """Get recent price history snapshots."""
-    all_history = state.price_history.get_history_range()
+    history = state.price_history.get_recent(limit, db=db)
+    return {
+        "total": state.price_history.get_snapshot_count(db=db),
+        "returned": len(history),
+        "history": history,
+    }
+
+
+@router.get("/history/{symbol}")
+async def get_symbol_history(
+    symbol: str,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Get the price series for a single symbol."""
+    series = state.price_history.get_symbol_series(symbol, start_time, end_time, db=db)
     return {
-        "total": len(all_history),
-        "returned": len(all_history[-limit:]),
-        "history": all_history[-limit:],
+        "symbol": symbol,
+        "count": len(series),
+        "series": series,
     }
@@ -16,17 +16,20 @@ async def ws_observe(ws: WebSocket):
         return
 
     state.active_websockets.add(ws)
+    state.awaiting_snapshot.add(ws)
 
     try:
+        # Broadcast-only stream: ignore client frames without decoding them and
+        # just wait for the disconnect message
         while True:
-            try:
-                await ws.receive_text()
-            except WebSocketDisconnect:
+            message = await ws.receive()
+            if message["type"] == "websocket.disconnect":
                 break
     except WebSocketDisconnect:
         pass
     finally:
         state.active_websockets.discard(ws)
+        state.awaiting_snapshot.discard(ws)
         try:
             await ws.close()
         except Exception:
@@ -26,3 +26,6 @@ def load_config() -> Dict[str, Any]:
 CONFIG = load_config()
 STREAM_INTERVAL = float(CONFIG.get("streamIntervalSeconds", 1))
 SYMBOLS = CONFIG.get("symbols", [])
+WS_BATCH_SIZE = max(1, int(CONFIG.get("wsBatchSize", 1)))
+WS_ENCODING = CONFIG.get("wsEncoding", "json")  # "json" or "msgpack"
+HISTORY_MAX_SNAPSHOTS = int(CONFIG.get("historyMaxSnapshots", 86400))
@@ -21,8 +21,10 @@ CANDLES_4H_PATH = CANDLES_DIR / "4h.json"
 CANDLES_DAILY_PATH = CANDLES_DIR / "daily.json"
 CANDLES_3D_PATH = CANDLES_DIR / "3d.json"
 CLIENT_HTML_PATH = BASE_DIR / "app" / "static" / "client.html"
+MSGPACK_DECODER_JS_PATH = BASE_DIR / "app" / "static" / "msgpack-decode.js"
 EXTRACT_PAIRS_HTML_PATH = METADATA_DIR / "toscrap.html"
 EXTRACTED_PAIRS_PATH = STORAGE_DIR / "extracted_pairs.json"
+OBSERVER_STATE_PATH = STORAGE_DIR / "observer_state.json"
 
 CANDLES_PATHS = {
     "1m": CANDLES_1M_PATH,
@@ -1,8 +1,10 @@
 import asyncio
-from typing import Set
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Set
 
 from fastapi import WebSocket
 
+from app.core.config import HISTORY_MAX_SNAPSHOTS
 from app.db.database import init_db
 from app.services.alerts import AlertManager
 from app.services.email_service import EmailService
@@ -19,14 +21,19 @@ except Exception as e:
     print(f"Warning: Database initialization failed: {e}")
 
 alert_manager = AlertManager()
-price_history = PriceHistory()
+price_history = PriceHistory(max_recent=HISTORY_MAX_SNAPSHOTS)
 replay_manager = ReplayManager()
 candle_storage = CandleStorage()
 
 observer: SiteObserver | None = None
 active_websockets: Set[WebSocket] = set()
+# Connected clients that have not yet received a full snapshot frame
+awaiting_snapshot: Set[WebSocket] = set()
 background_task: asyncio.Task | None = None
-shutdown_event = asyncio.Event()
 
 email_service: EmailService | None = None
 sms_service: SMSService | None = None
+compute_executor: ThreadPoolExecutor | None = None
+notification_executor: ThreadPoolExecutor | None = None
+alert_queue: asyncio.Queue | None = None
+alert_workers: List[asyncio.Task] = []
@@ -28,7 +28,7 @@ try:
     engine = create_engine(
         DATABASE_URL,
         echo=os.getenv("SQL_ECHO", "False").lower() == "true",
-        pool_size=10,
+        pool_size=20,
         max_overflow=20,
         pool_pre_ping=True,  # Test connections before using
     )
@@ -59,7 +59,9 @@ def init_db() -> None:
     """Initialize database - create all tables."""
     logger.info("Initializing database...")
     try:
-        Base.metadata.create_all(bind=engine)
+        # One connection and one transaction for every table, index and DDL hook
+        with engine.begin() as conn:
+            Base.metadata.create_all(bind=conn, checkfirst=True)
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error("Failed to initialize database: %s", e)
@@ -1,18 +1,33 @@
 import asyncio
+import functools
+import gc
+import hashlib
 import logging
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+from collections import defaultdict
+from typing import Callable, Dict, List, Tuple
 
+import msgpack
+import orjson
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.api.v1.api import api_router
 from app.api.v1.endpoints.public import router as public_router
 from app.api.v1.endpoints.stream import router as stream_router
 from app.core import state
-from app.core.config import CONFIG, STREAM_INTERVAL, SYMBOLS
+from app.core.config import (
+    CONFIG,
+    STREAM_INTERVAL,
+    SYMBOLS,
+    WS_BATCH_SIZE,
+    WS_ENCODING,
+)
 from app.services.email_service import EmailService
-from app.services.observer import SiteObserver
+from app.services.observer import SiteObserver, close_shared_browser
 from app.services.sms_service import SMSService
 
 # Configure logging with local time
@@ -28,6 +43,7 @@ app = FastAPI(
     title="Commodities Observer",
     description="Real-time commodities price monitoring with price alerts",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 # Configure CORS middleware for cross-origin requests
@@ -44,14 +60,181 @@ app.include_router(stream_router)
 app.include_router(api_router, prefix="/api")
 
 
+# Encoder for WebSocket frames, selected by the wsEncoding config key
+if WS_ENCODING == "msgpack":
+    encode_payload = functools.partial(msgpack.packb, use_bin_type=True)
+else:
+    encode_payload = orjson.dumps
+
+# Upper bound on concurrent WebSocket sends per broadcast
+BROADCAST_CONCURRENCY = 256
+
+
+async def broadcast(payload: bytes, websockets=None) -> None:
+    """Send one pre-encoded payload to WebSocket clients concurrently.
+
+    Goes to every connected client unless websockets is given.
+    """
+    websockets = list(state.active_websockets if websockets is None else websockets)
+    semaphore = asyncio.Semaphore(BROADCAST_CONCURRENCY)
+    # Same ASGI message for every client, equivalent to ws.send_bytes(payload)
+    message = {"type": "websocket.send", "bytes": payload}
+
+    async def _send(ws):
+        async with semaphore:
+            await ws.send(message)
+
+    results = await asyncio.gather(*(_send(ws) for ws in websockets), return_exceptions=True)
+
+    # Remove disconnected clients
+    disconnected = {ws for ws, result in zip(websockets, results) if isinstance(result, Exception)}
+    if disconnected:
+        state.active_websockets.difference_update(disconnected)
+        state.awaiting_snapshot.difference_update(disconnected)
+        logger.info("Removed %s disconnected WebSocket clients", len(disconnected))
+
+
+# Outbound alert queue: the monitor enqueues jobs, workers drain them
+ALERT_QUEUE_SIZE = 1000
+ALERT_WORKERS = 4
+
+
+def enqueue_alerts(channel: str, items: List[Tuple[dict, float]]) -> None:
+    """Queue one batched notification job for a channel without blocking the monitor.
+
+    items are (alert, current_price) pairs.
+    """
+    try:
+        state.alert_queue.put_nowait({"channel": channel, "items": items})
+    except asyncio.QueueFull:
+        logger.warning("Alert queue full, dropping %s %s alerts", len(items), channel)
+
+
+def _alert_message_fields(alert: dict, current_price: float) -> dict:
+    """Keyword arguments shared by every channel's send_price_alert."""
+    return {
+        "pair": alert["pair"],
+        "target_price": alert["target_price"],
+        "current_price": current_price,
+        "condition": alert["condition"],
+        "custom_message": alert.get("custom_message", ""),
+    }
+
+
+def _send_sms(items: List[Tuple[dict, float]]) -> bool:
+    return state.sms_service.send_batch([
+        {"to_phone": alert["phone"], **_alert_message_fields(alert, current_price)}
+        for alert, current_price in items
+    ])
+
+
+def _send_email(items: List[Tuple[dict, float]]) -> bool:
+    return state.email_service.send_batch([
+        {"to_email": alert["email"], **_alert_message_fields(alert, current_price)}
+        for alert, current_price in items
+    ])
+
+
+# Alert field holding the recipient for each channel
+CHANNEL_RECIPIENT_FIELD = {"sms": "phone", "email": "email"}
+
+# channel -> batch sender([(alert, current_price), ...]); only enabled services are present
+CHANNEL_DISPATCH: Dict[str, Callable[[List[Tuple[dict, float]]], bool]] = {}
+
+
+def build_channel_dispatch() -> None:
+    """Register a sender for each notification service that was initialized."""
+    CHANNEL_DISPATCH.clear()
+    if state.sms_service:
+        CHANNEL_DISPATCH["sms"] = _send_sms
+    if state.email_service:
+        CHANNEL_DISPATCH["email"] = _send_email
+
+
+async def _dispatch_alert(job: dict) -> None:
+    """Send one queued batch of alerts via its channel on the notification thread pool."""
+    channel = job["channel"]
+    items = job["items"]
+    send = functools.partial(CHANNEL_DISPATCH[channel], items)
+
+    loop = asyncio.get_running_loop()
+    if await loop.run_in_executor(state.notification_executor, send):
+        pairs = ", ".join(sorted({alert["pair"] for alert, _ in items}))
+        logger.info("%s alerts sent: %s for %s", channel.upper(), len(items), pairs)
+
+
+async def alert_worker(queue: asyncio.Queue) -> None:
+    """Drain the alert queue, sending one batch at a time."""
+    while True:
+        job = await queue.get()
+        try:
+            await _dispatch_alert(job)
+        except Exception as e:
+            logger.error("Failed to send %s alert: %s", job["channel"], e)
+        finally:
+            queue.task_done()
+
+
+# Seconds between heartbeat frames while prices are unchanged
+HEARTBEAT_SECONDS = 10.0
+
+
+def pairs_fingerprint(pairs: List[Dict[str, str]]) -> bytes:
+    """16-byte digest of the pair/price list, used to detect unchanged snapshots."""
+    h = hashlib.blake2b(digest_size=16)
+    for item in pairs:
+        h.update(item["pair"].encode())
+        h.update(b"|")
+        h.update(item["price"].encode())
+        h.update(b"\n")
+    return h.digest()
+
+
+def store_tick(data: dict) -> None:
+    """Store a snapshot in price history and aggregate it into candles.
+
+    Runs on state.compute_executor.
+    """
+    # Store in price history for replay functionality
+    state.price_history.add_snapshot(data)
+
+    # Aggregate into candles for all timeframes
+    try:
+        from app.services.candle_aggregator import CandleAggregator
+        aggregator = CandleAggregator()
+
+        # Get all pairs from the latest snapshot
+        for pair_data in data.get("pairs", []):
+            pair = pair_data.get("pair")
+            if pair:
+                # Aggregate this pair's data
+                aggregated = aggregator.aggregate_snapshots(
+                    state.price_history.history, pair
+                )
+                # Store candles for each timeframe
+                for timeframe, candles in aggregated.items():
+                    if candles:
+                        state.candle_storage.add_candles_batch(timeframe, candles)
+    except Exception as e:
+        logger.warning("Error aggregating candles: %s", e)
+
+
 async def background_monitoring_task():
     """Background task that continuously monitors prices and checks alerts.
     Runs independently of WebSocket connections.
     Stores historical data for replay functionality.
     """
     logger.info("Background monitoring task started")
-
-    while not state.shutdown_event.is_set():
+    replay_ticks = None
+    # Snapshots waiting to be sent as one batched frame (wsBatchSize > 1)
+    pending_batch = []
+    # Change detection: skip storing/broadcasting ticks whose prices did not move
+    last_fingerprint = b""
+    last_alert_rev = -1
+    last_broadcast = time.monotonic()
+
+    # Runs until on_shutdown cancels the task
+    while True:
         try:
             if not state.observer:
                 logger.warning("Observer not ready, waiting...")
@@ -61,98 +244,95 @@ async def background_monitoring_task():
             # Get snapshot data
             data = await state.observer.snapshot(SYMBOLS)
 
-            # Store in price history for replay functionality
-            state.price_history.add_snapshot(data)
-
-            # Aggregate into candles for all timeframes
-            try:
-                from app.services.candle_aggregator import CandleAggregator
-                aggregator = CandleAggregator()
-                
-                # Get all pairs from the latest snapshot
-                pairs = data.get("pairs", [])
-                for pair_data in pairs:
-                    pair = pair_data.get("pair")
-                    if pair:
-                        # Aggregate this pair's data
-                        aggregated = aggregator.aggregate_snapshots(
-                            state.price_history.history, pair
-                        )
-                        # Store candles for each timeframe
-                        for timeframe, candles in aggregated.items():
-                            if candles:
-                                state.candle_storage.add_candles_batch(timeframe, candles)
-            except Exception as e:
-                logger.warning("Error aggregating candles: %s", e)
+            # Failed extractions count as unchanged so error ticks are not stored
+            prices_changed = False
+            if "error" not in data:
+                fingerprint = pairs_fingerprint(data.get("pairs", []))
+                prices_changed = fingerprint != last_fingerprint
+                last_fingerprint = fingerprint
+
+            # Store in price history and aggregate candles off the event loop
+            loop = asyncio.get_running_loop()
+            if prices_changed:
+                await loop.run_in_executor(state.compute_executor, store_tick, data)
 
             # Check if we're in replay mode - if so, get next snapshot from replay
-            if state.replay_manager.is_replaying():
-                replayed_snapshot = state.replay_manager.get_next_snapshot()
-                if replayed_snapshot:
-                    data = replayed_snapshot.get("snapshot", data)
+            replaying = state.replay_manager.is_replaying()
+            if replaying:
+                if replay_ticks is None:
+                    replay_ticks = state.replay_manager.iter_snapshots()
+                tick = next(replay_ticks, None)
+                if tick:
+                    data = tick[1] or data
                 else:
                     # Replay finished
+                    replay_ticks = None
                     logger.info("Replay finished")
 
-            # Check price alerts
-            triggered_alerts = state.alert_manager.check_alerts(data.get("pairs", []))
+            # Check price alerts (same single-thread executor, so ticks stay ordered)
+            triggered_alerts = await loop.run_in_executor(
+                state.compute_executor, state.alert_manager.check_alerts, data.get("pairs", [])
+            )
             if triggered_alerts:
                 logger.info("Processing %s triggered alerts", len(triggered_alerts))
+                # One batched send per channel for everything triggered this tick
+                by_channel: Dict[str, List[Tuple[dict, float]]] = defaultdict(list)
                 for alert_data in triggered_alerts:
                     alert = alert_data["alert"]
                     current_price = alert_data["current_price"]
-                    channels = alert.get("channels", [])
-
-                    # Send via SMS if configured
-                    if "sms" in channels and state.sms_service and alert.get("phone"):
-                        try:
-                            state.sms_service.send_price_alert(
-                                to_phone=alert["phone"],
-                                pair=alert["pair"],
-                                target_price=alert["target_price"],
-                                current_price=current_price,
-                                condition=alert["condition"],
-                                custom_message=alert.get("custom_message", ""),
-                            )
-                            logger.info("SMS alert sent for %s to %s", alert["pair"], alert["phone"])
-                        except Exception as e:
-                            logger.error("Failed to send SMS alert: %s", e)
-
-                    # Send via Email if configured
-                    if "email" in channels and state.email_service and alert.get("email"):
-                        try:
-                            state.email_service.send_price_alert(
-                                to_email=alert["email"],
-                                pair=alert["pair"],
-                                target_price=alert["target_price"],
-                                current_price=current_price,
-                                condition=alert["condition"],
-                                custom_message=alert.get("custom_message", ""),
-                            )
-                            logger.info("Email alert sent for %s to %s", alert["pair"], alert["email"])
-                        except Exception as e:
-                            logger.error("Failed to send email alert: %s", e)
+                    # Channels whose service is disabled have no dispatch entry
+                    for channel in alert.get("channels", ()):
+                        if channel in CHANNEL_DISPATCH and alert.get(CHANNEL_RECIPIENT_FIELD[channel]):
+                            by_channel[channel].append((alert, current_price))
+                for channel, items in by_channel.items():
+                    enqueue_alerts(channel, items)
+
+            alert_rev = state.alert_manager.revision
+            has_update = bool(
+                prices_changed
+                or replaying
+                or triggered_alerts
+                or alert_rev != last_alert_rev
+            )
 
             # Include alerts in data for WebSocket clients
-            all_alerts = state.alert_manager.get_all_alerts()
-            data["alerts"] = {
-                "active": [a for a in all_alerts if a["status"] == "active"],
-                "triggered": [a for a in all_alerts if a["status"] == "triggered"],
-            }
+            if has_update or state.awaiting_snapshot:
+                data["alerts"] = state.alert_manager.get_alerts_by_status()
+
+            # Newly connected clients get a full frame right away, even when batching
+            new_clients = list(state.awaiting_snapshot)
+            state.awaiting_snapshot.clear()
+            frame = encode_payload(data) if new_clients or (has_update and WS_BATCH_SIZE == 1) else None
+            if new_clients:
+                await broadcast(frame, new_clients)
+
+            # Nothing new for the other clients: send an occasional heartbeat instead
+            if not has_update:
+                # Don't hold a partial batch back while prices are idle
+                if pending_batch:
+                    payload = encode_payload({"type": "batch", "snapshots": pending_batch})
+                    pending_batch.clear()
+                    await broadcast(payload)
+                    last_broadcast = time.monotonic()
+                elif state.active_websockets and time.monotonic() - last_broadcast >= HEARTBEAT_SECONDS:
+                    await broadcast(encode_payload({"type": "nop"}))
+                    last_broadcast = time.monotonic()
+                await asyncio.sleep(STREAM_INTERVAL)
+                continue
+            last_alert_rev = alert_rev
+            last_broadcast = time.monotonic()
 
             # Broadcast to all connected WebSocket clients
-            if state.active_websockets:
-                disconnected = set()
-                for ws in state.active_websockets:
-                    try:
-                        await ws.send_json(data)
-                    except Exception:
-                        disconnected.add(ws)
-
-                # Remove disconnected clients
-                state.active_websockets.difference_update(disconnected)
-                if disconnected:
-                    logger.info("Removed %s disconnected WebSocket clients", len(disconnected))
+            if not state.active_websockets:
+                pending_batch.clear()
+            elif WS_BATCH_SIZE == 1:
+                await broadcast(frame, state.active_websockets.difference(new_clients))
+            else:
+                pending_batch.append(data)
+                if len(pending_batch) >= WS_BATCH_SIZE:
+                    payload = encode_payload({"type": "batch", "snapshots": pending_batch})
+                    pending_batch.clear()
+                    await broadcast(payload)
 
             # Wait for next interval
             await asyncio.sleep(STREAM_INTERVAL)
@@ -172,7 +352,13 @@ async def on_startup():
     """Initialize the observer on application startup."""
     logger.info("Starting Commodities Observer application...")
 
-    state.shutdown_event.clear()
+    # One worker keeps storage and alert checks in tick order
+    state.compute_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="compute")
+    state.notification_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="notify")
+    state.alert_queue = asyncio.Queue(maxsize=ALERT_QUEUE_SIZE)
+    state.alert_workers = [
+        asyncio.create_task(alert_worker(state.alert_queue)) for _ in range(ALERT_WORKERS)
+    ]
 
     sendgrid_api_key = os.getenv("SENDGRID_API_KEY")
     if sendgrid_api_key:
@@ -193,6 +379,8 @@ async def on_startup():
     else:
         logger.warning("AFRICASTALKING credentials not set, SMS alerts disabled")
 
+    build_channel_dispatch()
+
     try:
         state.observer = SiteObserver(
             url=CONFIG.get("url"),
@@ -209,6 +397,9 @@ async def on_startup():
         state.background_task = asyncio.create_task(background_monitoring_task())
         logger.info("Background monitoring task created")
 
+        # Long-lived startup objects no longer need scanning by the cyclic GC
+        gc.freeze()
+
     except Exception as e:
         logger.error("Failed to start observer: %s", e)
         raise
@@ -219,7 +410,6 @@ async def on_shutdown():
     """Clean up resources on application shutdown."""
     # Stop background task
     logger.info("Stopping background monitoring task...")
-    state.shutdown_event.set()
     if state.background_task:
         state.background_task.cancel()
         try:
@@ -228,11 +418,23 @@ async def on_shutdown():
             pass
         logger.info("Background monitoring task stopped")
 
+    # Stop alert workers
+    for worker in state.alert_workers:
+        worker.cancel()
+    await asyncio.gather(*state.alert_workers, return_exceptions=True)
+    state.alert_workers = []
+
+    if state.compute_executor:
+        state.compute_executor.shutdown(wait=False)
+    if state.notification_executor:
+        state.notification_executor.shutdown(wait=False)
+
     # Shutdown observer
     if state.observer:
         logger.info("Shutting down observer...")
         try:
             await state.observer.shutdown()
+            await close_shared_browser()
             logger.info("Observer shutdown complete")
         except Exception as e:
             logger.error("Error during shutdown: %s", e)
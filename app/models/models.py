@@ -2,8 +2,8 @@
 SQLAlchemy ORM models for commodities application.
 """
 from datetime import datetime
-from sqlalchemy import Column, String, Float, DateTime, Integer, JSON, Index
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import BigInteger, Column, DDL, String, Float, DateTime, Integer, JSON, Index, event, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 import uuid
 
 from app.db.database import Base
@@ -36,14 +36,107 @@ class PriceHistory(Base):
     __tablename__ = "price_history"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    timestamp = Column(DateTime, nullable=False, index=True)
-    snapshot = Column(JSON, nullable=False)  # Full snapshot data
+    timestamp = Column(DateTime(timezone=True), nullable=False)
+    snapshot = Column(JSONB, nullable=False)  # Full snapshot data
 
     __table_args__ = (
+        # Also serves ORDER BY timestamp DESC LIMIT 1 via a backward scan
         Index('idx_price_history_timestamp', 'timestamp'),
+        # Containment lookups on snapshot->'pairs' for per-symbol series
+        Index(
+            'idx_price_history_snapshot_pairs',
+            text("(snapshot -> 'pairs') jsonb_path_ops"),
+            postgresql_using='gin',
+        ),
     )
 
 
+# create_all never alters an existing table, so databases created before
+# snapshot became JSONB / timestamp became timestamptz are upgraded here. Each
+# step is a no-op once applied.
+PRICE_HISTORY_UPGRADE_DDL = DDL("""
+DO $$
+BEGIN
+    IF (SELECT data_type FROM information_schema.columns
+        WHERE table_schema = current_schema()
+          AND table_name = 'price_history' AND column_name = 'snapshot') = 'json' THEN
+        ALTER TABLE price_history ALTER COLUMN snapshot TYPE jsonb USING snapshot::jsonb;
+    END IF;
+    -- Existing naive values are interpreted in the session TimeZone
+    IF (SELECT data_type FROM information_schema.columns
+        WHERE table_schema = current_schema()
+          AND table_name = 'price_history' AND column_name = 'timestamp') = 'timestamp without time zone' THEN
+        ALTER TABLE price_history ALTER COLUMN "timestamp" TYPE timestamptz;
+    END IF;
+END
+$$;
+
+-- Redundant with idx_price_history_timestamp; only cost an extra write per insert
+DROP INDEX IF EXISTS ix_price_history_ts_desc;
+CREATE INDEX IF NOT EXISTS idx_price_history_snapshot_pairs
+    ON price_history USING gin ((snapshot -> 'pairs') jsonb_path_ops);
+""")
+
+event.listen(
+    Base.metadata,
+    "after_create",
+    PRICE_HISTORY_UPGRADE_DDL.execute_if(dialect="postgresql"),
+)
+
+
+class PriceHistoryStats(Base):
+    """One-row counter of price_history rows, maintained by a trigger."""
+    __tablename__ = "price_history_stats"
+
+    id = Column(Integer, primary_key=True, default=1)
+    n = Column(BigInteger, nullable=False, default=0)
+
+
+# Keep price_history_stats.n in sync with inserts/deletes so the snapshot count
+# is a single-row read instead of a count(*) heap scan.
+PRICE_HISTORY_STATS_DDL = DDL("""
+CREATE OR REPLACE FUNCTION price_history_stats_insert() RETURNS trigger AS $$
+BEGIN
+    UPDATE price_history_stats SET n = n + (SELECT count(*) FROM new_rows) WHERE id = 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION price_history_stats_delete() RETURNS trigger AS $$
+BEGIN
+    UPDATE price_history_stats SET n = n - (SELECT count(*) FROM old_rows) WHERE id = 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- One update per statement; transition tables allow a single event per trigger
+DROP TRIGGER IF EXISTS price_history_stats_trg ON price_history;
+DROP FUNCTION IF EXISTS price_history_stats_sync();
+
+DROP TRIGGER IF EXISTS price_history_stats_ins_trg ON price_history;
+CREATE TRIGGER price_history_stats_ins_trg
+    AFTER INSERT ON price_history
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION price_history_stats_insert();
+
+DROP TRIGGER IF EXISTS price_history_stats_del_trg ON price_history;
+CREATE TRIGGER price_history_stats_del_trg
+    AFTER DELETE ON price_history
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION price_history_stats_delete();
+
+INSERT INTO price_history_stats (id, n)
+    SELECT 1, count(*) FROM price_history
+    ON CONFLICT (id) DO NOTHING;
+""")
+
+event.listen(
+    Base.metadata,
+    "after_create",
+    PRICE_HISTORY_STATS_DDL.execute_if(dialect="postgresql"),
+)
+
+
 class Candle(Base):
     """ORM model for OHLC candles across multiple timeframes."""
     __tablename__ = "candles"
@@ -1,13 +1,21 @@
-from typing import List
+from typing import List, Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 
 
 class CreateAlertRequest(BaseModel):
     pair: str
     target_price: float
-    condition: str  # "above", "below", or "equal"
-    channels: List[str] = ["email"]  # ["email"], ["sms"], or ["email", "sms"]
+    condition: Literal["above", "below", "equal"]
+    channels: List[Literal["email", "sms"]] = Field(default=["email"], min_length=1)
     email: str = ""
     phone: str = ""
     custom_message: str = ""  # Optional custom message for the alert
+
+    @model_validator(mode="after")
+    def check_recipients(self) -> "CreateAlertRequest":
+        if "email" in self.channels and not self.email:
+            raise ValueError("Email is required for email alerts")
+        if "sms" in self.channels and not self.phone:
+            raise ValueError("Phone is required for SMS alerts")
+        return self
@@ -1,9 +1,11 @@
 """
 Alert management system for price notifications - PostgreSQL version.
 """
+import bisect
 import logging
+import threading
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import uuid
 from contextlib import contextmanager
 
@@ -55,7 +57,23 @@ class AlertManager:
 
     def __init__(self):
         """Initialize alert manager. No persistent session stored."""
-        pass
+        # id -> alert dict for active/triggered alerts, loaded on first use
+        self._by_status: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None
+        # Bumped on every alert mutation; invalidates the cached status lists
+        self._rev: int = 0
+        self._cached_rev: int = -1
+        self._cached_active_dicts: List[Dict[str, Any]] = []
+        self._cached_triggered_dicts: List[Dict[str, Any]] = []
+        # pair -> sorted above/below thresholds and equal alerts, rebuilt per revision
+        self._thresholds: Dict[str, Tuple[list, ...]] = {}
+        self._thresholds_rev: int = -1
+        # check_alerts runs on a worker thread; guards the index and cached lists
+        self._index_lock = threading.RLock()
+
+    @property
+    def revision(self) -> int:
+        """Counter that changes whenever an alert is created, deleted or triggered."""
+        return self._rev
 
     @contextmanager
     def _get_session(self):
@@ -102,8 +120,10 @@ class AlertManager:
             db.flush()  # Get the ID without committing yet
             db.refresh(alert)
             result = self._to_dict(alert)
-            logger.info("Created alert %s for %s at %s via %s", alert.id, pair, target_price, channels)
-            return result
+
+        self._index_alert(result["id"], result)
+        logger.info("Created alert %s for %s at %s via %s", result["id"], pair, target_price, channels)
+        return result
 
     def get_alert(self, alert_id: str) -> Optional[Dict[str, Any]]:
         """Get alert by ID."""
@@ -125,9 +145,22 @@ class AlertManager:
 
     def get_active_alerts(self) -> List[Dict[str, Any]]:
         """Get only active alerts."""
-        with self._get_session() as db:
-            alerts = db.query(AlertModel).filter(AlertModel.status == "active").all()
-            return [self._to_dict(a) for a in alerts]
+        with self._index_lock:
+            return list(self._status_index()["active"].values())
+
+    def get_alerts_by_status(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Get active and triggered alerts, rebuilt only after an alert mutation."""
+        with self._index_lock:
+            index = self._status_index()
+            if self._cached_rev != self._rev:
+                rev = self._rev
+                self._cached_active_dicts = list(index["active"].values())
+                self._cached_triggered_dicts = list(index["triggered"].values())
+                self._cached_rev = rev
+            return {
+                "active": self._cached_active_dicts,
+                "triggered": self._cached_triggered_dicts,
+            }
 
     def delete_alert(self, alert_id: str) -> bool:
         """Delete an alert."""
@@ -135,15 +168,17 @@ class AlertManager:
             try:
                 alert_uuid = uuid.UUID(str(alert_id)) if not isinstance(alert_id, uuid.UUID) else alert_id
                 alert = db.query(AlertModel).filter(AlertModel.id == alert_uuid).first()
-                if alert:
-                    db.delete(alert)
-                    logger.info("Deleted alert %s", alert_id)
-                    return True
-                return False
+                if not alert:
+                    return False
+                db.delete(alert)
             except (ValueError, AttributeError) as e:
                 logger.error("Invalid alert_id format: %s - %s", alert_id, e)
                 return False
 
+        self._index_alert(str(alert_uuid), None)
+        logger.info("Deleted alert %s", alert_id)
+        return True
+
     def trigger_alert(self, alert_id: str, current_price: float) -> bool:
         """Mark an alert as triggered."""
         with self._get_session() as db:
@@ -151,17 +186,70 @@ class AlertManager:
                 # Ensure alert_id is a valid UUID
                 alert_uuid = uuid.UUID(str(alert_id)) if not isinstance(alert_id, uuid.UUID) else alert_id
                 alert = db.query(AlertModel).filter(AlertModel.id == alert_uuid).first()
-                if alert:
-                    alert.status = "triggered"
-                    alert.triggered_at = datetime.utcnow()
-                    alert.last_checked_price = current_price
-                    logger.info("Triggered alert %s at price %s", alert_id, current_price)
-                    return True
-                return False
+                if not alert:
+                    return False
+                alert.status = "triggered"
+                alert.triggered_at = datetime.utcnow()
+                alert.last_checked_price = current_price
+                triggered = self._to_dict(alert)
             except (ValueError, AttributeError) as e:
                 logger.error("Invalid alert_id format: %s - %s", alert_id, e)
                 return False
 
+        self._index_alert(triggered["id"], triggered)
+        logger.info("Triggered alert %s at price %s", alert_id, current_price)
+        return True
+
+    def _status_index(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Get the id -> alert maps for active and triggered alerts, loading them on first use."""
+        with self._index_lock:
+            if self._by_status is None:
+                by_status: Dict[str, Dict[str, Dict[str, Any]]] = {"active": {}, "triggered": {}}
+                for alert in self.get_all_alerts():
+                    bucket = by_status.get(alert["status"])
+                    if bucket is not None:
+                        bucket[alert["id"]] = alert
+                self._by_status = by_status
+                self._rev += 1
+            return self._by_status
+
+    def _index_alert(self, alert_id: str, alert: Optional[Dict[str, Any]]) -> None:
+        """Move an alert into the bucket for its status, or drop it when alert is None."""
+        with self._index_lock:
+            index = self._status_index()
+            for bucket in index.values():
+                bucket.pop(alert_id, None)
+            if alert is not None and alert["status"] in index:
+                index[alert["status"]][alert_id] = alert
+            self._rev += 1
+
+    def _threshold_index(self) -> Dict[str, Tuple[list, ...]]:
+        """Get active alerts grouped by pair, with above/below alerts sorted by target price."""
+        with self._index_lock:
+            index = self._status_index()
+            if self._thresholds_rev != self._rev:
+                rev = self._rev
+                grouped: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+                for alert in index["active"].values():
+                    by_condition = grouped.setdefault(alert["pair"], {"above": [], "below": [], "equal": []})
+                    if alert["condition"] in by_condition:
+                        by_condition[alert["condition"]].append(alert)
+
+                thresholds = {}
+                for pair, by_condition in grouped.items():
+                    above = sorted(by_condition["above"], key=lambda a: a["target_price"])
+                    below = sorted(by_condition["below"], key=lambda a: a["target_price"])
+                    thresholds[pair] = (
+                        [a["target_price"] for a in above],
+                        above,
+                        [a["target_price"] for a in below],
+                        below,
+                        by_condition["equal"],
+                    )
+                self._thresholds = thresholds
+                self._thresholds_rev = rev
+            return self._thresholds
+
     @staticmethod
     def _get_tolerance(pair: str) -> float:
         """
@@ -181,33 +269,35 @@ class AlertManager:
         # Create price lookup - remove commas from price strings first
         prices = {item["pair"]: float(item["price"].replace(",", "")) for item in pairs_data}
 
-        active_alerts = self.get_active_alerts()
+        thresholds = self._threshold_index()
 
-        for alert_dict in active_alerts:
-            if alert_dict["pair"] not in prices:
+        for pair, current_price in prices.items():
+            entry = thresholds.get(pair)
+            if entry is None:
                 continue
+            above_targets, above, below_targets, below, equal = entry
 
-            current_price = prices[alert_dict["pair"]]
-
-            should_trigger = False
-            if alert_dict["condition"] == "above" and current_price >= alert_dict["target_price"]:
-                should_trigger = True
-            elif alert_dict["condition"] == "below" and current_price <= alert_dict["target_price"]:
-                should_trigger = True
-            elif alert_dict["condition"] == "equal":
-                tolerance = self._get_tolerance(alert_dict["pair"])
-                if abs(current_price - alert_dict["target_price"]) <= tolerance:
-                    should_trigger = True
-                    logger.info(
-                        "Equal alert triggered: %s price=%s target=%s tolerance=±%s",
-                        alert_dict["pair"],
-                        f"{current_price:.6f}",
-                        f"{alert_dict['target_price']:.6f}",
-                        f"{tolerance:.6f}",
-                    )
+            # above: target <= price; below: target >= price
+            matches = above[:bisect.bisect_right(above_targets, current_price)]
+            matches += below[bisect.bisect_left(below_targets, current_price):]
+
+            if equal:
+                tolerance = self._get_tolerance(pair)
+                for alert_dict in equal:
+                    if abs(current_price - alert_dict["target_price"]) <= tolerance:
+                        matches.append(alert_dict)
+                        logger.info(
+                            "Equal alert triggered: %s price=%s target=%s tolerance=±%s",
+                            pair,
+                            f"{current_price:.6f}",
+                            f"{alert_dict['target_price']:.6f}",
+                            f"{tolerance:.6f}",
+                        )
 
-            if should_trigger:
-                self.trigger_alert(alert_dict["id"], current_price)
+            for alert_dict in matches:
+                # False when the alert was deleted or triggered since the index was read
+                if not self.trigger_alert(alert_dict["id"], current_price):
+                    continue
                 triggered.append({
                     "alert": alert_dict,
                     "current_price": current_price,
@@ -4,13 +4,17 @@ Email notification service using SendGrid.
 import logging
 import os
 import ssl
+from typing import Any, Dict, List
 
 import certifi
 from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
+from sendgrid.helpers.mail import Mail, Personalization, Substitution, To
 
 logger = logging.getLogger(__name__)
 
+# SendGrid v3 limit on personalizations per mail/send request
+MAX_PERSONALIZATIONS = 1000
+
 # Configure SSL certificate verification
 ssl._create_default_https_context = lambda: ssl.create_default_context(cafile=certifi.where())
 
@@ -33,21 +37,92 @@ class EmailService:
     ) -> bool:
         """Send price alert email."""
         try:
-            # Build custom message section if provided
-            custom_msg_html = ""
-            if custom_message:
-                custom_msg_html = f"""
+            message = Mail(
+                from_email=self.from_email,
+                to_emails=to_email,
+                subject=self._subject(pair, condition, target_price),
+                html_content=self._html_content(
+                    pair,
+                    condition,
+                    target_price,
+                    current_price,
+                    self._get_timestamp(),
+                    self._custom_message_html(custom_message),
+                ),
+            )
+            response = self.sg.send(message)
+            logger.info("Email sent to %s (status: %s)", to_email, response.status_code)
+            return response.status_code == 202
+        except Exception as e:
+            logger.error("Failed to send email to %s: %s", to_email, e)
+            return False
+
+    def send_batch(self, alerts: List[Dict[str, Any]]) -> bool:
+        """Send several price alert emails in as few SendGrid requests as possible.
+
+        Each entry holds the send_price_alert keyword arguments. Every alert
+        becomes one personalization whose substitutions fill a shared template.
+        """
+        if len(alerts) == 1:
+            return self.send_price_alert(**alerts[0])
+
+        timestamp = self._get_timestamp()
+        ok = True
+        for start in range(0, len(alerts), MAX_PERSONALIZATIONS):
+            chunk = alerts[start:start + MAX_PERSONALIZATIONS]
+            try:
+                message = Mail(
+                    from_email=self.from_email,
+                    subject=self._subject("-pair-", "-condition-", "-target_price-"),
+                    html_content=self._html_content(
+                        "-pair-",
+                        "-condition-",
+                        "-target_price-",
+                        "-current_price-",
+                        timestamp,
+                        "-custom_message_html-",
+                    ),
+                )
+                for alert in chunk:
+                    personalization = Personalization()
+                    personalization.add_to(To(alert["to_email"]))
+                    for key, value in (
+                        ("-pair-", alert["pair"]),
+                        ("-condition-", alert["condition"]),
+                        ("-target_price-", alert["target_price"]),
+                        ("-current_price-", alert["current_price"]),
+                        ("-custom_message_html-", self._custom_message_html(alert.get("custom_message", ""))),
+                    ):
+                        personalization.add_substitution(Substitution(key, str(value)))
+                    message.add_personalization(personalization)
+
+                response = self.sg.send(message)
+                logger.info("Batch email sent to %s recipients (status: %s)", len(chunk), response.status_code)
+                ok = ok and response.status_code == 202
+            except Exception as e:
+                logger.error("Failed to send batch email to %s recipients: %s", len(chunk), e)
+                ok = False
+        return ok
+
+    @staticmethod
+    def _subject(pair: str, condition: str, target_price) -> str:
+        return f"🚨 Price Alert: {pair} reached {condition} {target_price}"
+
+    @staticmethod
+    def _custom_message_html(custom_message: str) -> str:
+        """Build custom message section if provided."""
+        if not custom_message:
+            return ""
+        return f"""
                         <div style="background-color: #f0f8ff; border-left: 4px solid #007bff; padding: 12px; margin: 15px 0;">
                             <strong>Your Message:</strong><br>
                             <p style="margin: 8px 0; white-space: pre-wrap;">{custom_message}</p>
                         </div>
                 """
 
-            message = Mail(
-                from_email=self.from_email,
-                to_emails=to_email,
-                subject=f"🚨 Price Alert: {pair} reached {condition} {target_price}",
-                html_content=f"""
+    @staticmethod
+    def _html_content(pair, condition, target_price, current_price, timestamp, custom_msg_html) -> str:
+        return f"""
                 <html>
                     <body>
                         <h2>Price Alert Triggered!</h2>
@@ -56,20 +131,13 @@ class EmailService:
                             <li><strong>Pair:</strong> {pair}</li>
                             <li><strong>Condition:</strong> Price {condition} {target_price}</li>
                             <li><strong>Current Price:</strong> {current_price}</li>
-                            <li><strong>Time:</strong> {self._get_timestamp()}</li>
+                            <li><strong>Time:</strong> {timestamp}</li>
                         </ul>
                         {custom_msg_html}
                         <p><a href="http://localhost:8000">View Dashboard</a></p>
                     </body>
                 </html>
-                """,
-            )
-            response = self.sg.send(message)
-            logger.info("Email sent to %s (status: %s)", to_email, response.status_code)
-            return response.status_code == 202
-        except Exception as e:
-            logger.error("Failed to send email to %s: %s", to_email, e)
-            return False
+                """
 
     @staticmethod
     def _get_timestamp() -> str:
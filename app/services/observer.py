@@ -1,16 +1,255 @@
 import asyncio
-import json
 import logging
+import os
 import re
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, Union
 
-from playwright.async_api import async_playwright, Browser, Page
+import orjson
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page
 
-from app.core.paths import CONFIG_PATH
+from app.core.paths import CONFIG_PATH, OBSERVER_STATE_PATH
 
 logger = logging.getLogger(__name__)
 
+# OBSERVER_DEBUG=1 saves a screenshot and page details when the table never appears
+_DEBUG = os.getenv("OBSERVER_DEBUG", "0") not in ("", "0")
+
+# Static scripts below take their selectors as the page.evaluate argument, so
+# the source text is identical on every call and V8 can reuse the compiled code
+_EXTRACT_PAIR_CELLS_JS = """
+(sel) => {
+    const table = document.querySelector(sel.table);
+    if (!table) return [];
+    const cells = table.querySelectorAll(sel.pairCell);
+    return Array.from(cells).map(td => td.textContent.trim()).filter(Boolean);
+}
+"""
+
+_EXTRACT_PAIRS_JS = """
+(sel) => {
+    const table = document.querySelector(sel.table);
+    if (!table) return [];
+    const rows = table.querySelectorAll('tbody tr');
+    return Array.from(rows).map(row => {
+        const cells = row.querySelectorAll('td');
+        const priceIndex = sel.priceIndex;
+        if (cells.length <= priceIndex) return null;
+
+        // Get pair name from first column that contains .symbol or second column
+        let pairText = '';
+        const symbolEl = cells[0]?.querySelector('.symbol');
+        if (symbolEl) {
+            pairText = symbolEl.textContent.trim();
+        } else {
+            pairText = cells[1]?.textContent.trim() || '';
+        }
+
+        const priceText = cells[priceIndex]?.textContent.trim() || '';
+        // Extract just the price (first number before any +/- change)
+        const priceMatch = priceText.match(/^([\\d,\\.]+)/);
+        return {
+            pair: pairText,
+            price: priceMatch ? priceMatch[1] : priceText
+        };
+    }).filter(item => item && item.pair && item.price);
+}
+"""
+
+# Collects {pair, price} for every watchlist row, plus the page title and the
+# pending mutation records, in a single page.evaluate
+_EXTRACT_SYMBOLS_JS = """
+() => {
+    const rows = [];
+    for (const symbolEl of document.querySelectorAll('.symbol-RsFlttSS')) {
+        const pair = (symbolEl.querySelector('.symbolNameText-RsFlttSS')?.textContent || '').trim();
+        if (!pair) continue;
+        const priceEl = symbolEl.querySelector('.last-RsFlttSS .inner-RsFlttSS');
+        if (!priceEl) continue;
+        // Remove all whitespace, including line breaks inside multi-line prices
+        const text = priceEl.textContent;
+        rows.push({ pair, price: text ? text.replace(/\\s+/g, '') : '0' });
+    }
+    return { rows, title: document.title, changes: (window.__changes || []).splice(0) };
+}
+"""
+
+# Resolves with a description of the first visible consent button matching a
+# selector or label, or null after timeoutMs. The match is tagged with
+# data-observer-consent so Playwright can click it.
+_FIND_CONSENT_BUTTON_JS = """
+({ selectors, labels, timeoutMs }) => new Promise(resolve => {
+    const visible = el => el && el.offsetParent !== null;
+    const find = () => {
+        for (const sel of selectors) {
+            const el = document.querySelector(sel);
+            if (visible(el)) return [el, sel];
+        }
+        for (const el of document.querySelectorAll('button')) {
+            const text = el.textContent.trim();
+            const label = labels.find(l => text.includes(l));
+            if (label && visible(el)) return [el, `button with text "${label}"`];
+        }
+        return null;
+    };
+    const check = () => {
+        const match = find();
+        if (!match) return false;
+        match[0].setAttribute('data-observer-consent', '');
+        resolve(match[1]);
+        return true;
+    };
+    if (check()) return;
+    const mo = new MutationObserver(() => {
+        if (check()) { mo.disconnect(); clearTimeout(timer); }
+    });
+    mo.observe(document.body, { childList: true, subtree: true });
+    const timer = setTimeout(() => { mo.disconnect(); resolve(null); }, timeoutMs);
+})
+"""
+
+# Candidate popup/modal containers, checked in order
+_POPUP_SELECTORS = [
+    # Generic modal/overlay patterns
+    'div[role="dialog"]',
+    'div[role="alertdialog"]',
+    ".modal",
+    ".popup",
+    ".overlay",
+    "[class*='modal']",
+    "[class*='popup']",
+    "[class*='overlay']",
+    "[class*='dialog']",
+
+    # Specific close button patterns
+    'button[aria-label*="close"]',
+    'button[aria-label*="Close"]',
+    'button[aria-label*="dismiss"]',
+    "button.close",
+    "button.btn-close",
+    "[class*='close-button']",
+    "[class*='dismiss']",
+
+    # ESC key or click on overlay
+    ".backdrop",
+    ".dimmed",
+    "[class*='backdrop']",
+]
+
+# Close buttons looked up inside a detected popup
+_POPUP_CLOSE_SELECTORS = [
+    'button[aria-label*="close"]',
+    'button[aria-label*="dismiss"]',
+    "button.close",
+    "button.btn-close",
+    "[class*='close']",
+    'span[aria-label*="close"]',
+]
+
+# Returns {closed, how, popup}: how is the clicked close selector,
+# "not_closed" when a popup has no visible close button, or "none"
+_CLOSE_POPUP_JS = """
+({ popupSelectors, closeSelectors }) => {
+    const visible = el => {
+        const style = getComputedStyle(el);
+        return style.display !== 'none' && style.visibility !== 'hidden' && el.getClientRects().length > 0;
+    };
+    for (const popupSel of popupSelectors) {
+        const popup = document.querySelector(popupSel);
+        if (!popup || !visible(popup)) continue;
+        for (const closeSel of closeSelectors) {
+            const btn = popup.querySelector(closeSel);
+            if (btn && visible(btn)) {
+                btn.click();
+                return { closed: true, how: closeSel, popup: popupSel };
+            }
+        }
+        return { closed: false, how: 'not_closed', popup: popupSel };
+    }
+    return { closed: false, how: 'none', popup: null };
+}
+"""
+
+# Stall recoveries after which the browser context is replaced instead of reloaded
+CONTEXT_RECYCLE_RELOADS = 50
+
+# URL patterns blocked via CDP: the promo video plus image, font and media assets
+_BLOCKED_ASSET_EXTENSIONS = (
+    "png", "jpg", "jpeg", "gif", "webp", "svg", "ico",
+    "woff", "woff2", "ttf", "otf",
+    "mp4", "webm", "m4a", "mp3",
+)
+_BLOCKED_URL_PATTERNS = [
+    "*join-for-free*",
+    "*promo*",
+    # Extension must end the path (optionally followed by a query), so names
+    # like "icons.js" or "fonts.css" are not caught
+    *(f"*.{ext}" for ext in _BLOCKED_ASSET_EXTENSIONS),
+    *(f"*.{ext}?*" for ext in _BLOCKED_ASSET_EXTENSIONS),
+]
+
+# Separators between currency codes in pair names, e.g. "EUR/USD", "USD-JPY"
+_SPLIT_RE = re.compile(r"[\s/\-:]+")
+
+
+def _iso_utc(ns: int) -> str:
+    return datetime.fromtimestamp(ns / 1e9, tz=timezone.utc).isoformat()
+
+
+@lru_cache(maxsize=8)
+def _majors_set(majors: Tuple[str, ...]) -> FrozenSet[str]:
+    return frozenset(m.upper() for m in majors)
+
+
+# One Playwright driver and Chromium process per Python process; each
+# SiteObserver gets its own context in the shared browser.
+_PW = None
+_BROWSER: Optional[Browser] = None
+_BROWSER_LOCK = asyncio.Lock()
+
+
+async def _get_browser() -> Browser:
+    """Start Playwright and launch Chromium on first use, then reuse them."""
+    global _PW, _BROWSER
+    async with _BROWSER_LOCK:
+        if _BROWSER is None or not _BROWSER.is_connected():
+            if _PW is None:
+                _PW = await async_playwright().start()
+            _BROWSER = await _PW.chromium.launch(
+                # OBSERVER_HEADLESS=0 opens a visible window for debugging
+                headless=os.getenv("OBSERVER_HEADLESS", "1") != "0",
+                args=[
+                    "--disable-blink-features=AutomationControlled",
+                    "--disable-dev-shm-usage",
+                    "--no-sandbox",
+                    "--disable-setuid-sandbox",
+                    "--disable-web-resources",
+                    "--disable-extensions",
+                ],
+            )
+        return _BROWSER
+
+
+async def close_shared_browser() -> None:
+    """Close the shared browser and stop Playwright."""
+    global _PW, _BROWSER
+    async with _BROWSER_LOCK:
+        try:
+            if _BROWSER:
+                await _BROWSER.close()
+        except Exception as e:
+            logger.error("Error closing browser: %s", e)
+        finally:
+            _BROWSER = None
+            if _PW:
+                try:
+                    await _PW.stop()
+                except Exception as e:
+                    logger.error("Error stopping playwright: %s", e)
+                _PW = None
+
 
 class SiteObserver:
     def __init__(
@@ -29,138 +268,191 @@ class SiteObserver:
         self.inject_mutation_observer = inject_mutation_observer
         self.price_column_index = price_column_index
 
-        self._pw = None
+        # Shared with every other observer in the process, see _get_browser()
         self.browser: Optional[Browser] = None
         self.page: Optional[Page] = None
         # Track gold price to detect stalled data feed
         self._last_gold_price: Optional[str] = None
         self._last_gold_update_time: Optional[float] = None
         self._gold_stall_timeout: float = 30.0  # seconds before refresh if gold hasn't changed
+        self._reloads_since_recycle: int = 0
 
     async def startup(self) -> None:
         """Initialize the browser and navigate to the target URL."""
         try:
             logger.info("Starting browser and navigating to %s", self.url)
-            self._pw = await async_playwright().start()
-            self.browser = await self._pw.chromium.launch(
-                headless=True,
-                args=[
-                    "--disable-blink-features=AutomationControlled",
-                    "--disable-dev-shm-usage",
-                    "--no-sandbox",
-                    "--disable-setuid-sandbox",
-                    "--disable-web-resources",
-                    "--disable-extensions",
-                ],
-            )
-            context = await self.browser.new_context(
-                user_agent=(
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/120.0.0.0 Safari/537.36"
-                ),
-                locale="en-US",
-                viewport={"width": 1920, "height": 1080},
-                extra_http_headers={
-                    "Accept-Language": "en-US,en;q=0.9",
-                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                },
-            )
-            # Override navigator.webdriver flag
-            await context.add_init_script(
-                """{
-                Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
-            }"""
-            )
-            self.page = await context.new_page()
-            # Block the disruptive promo video and heavy assets
-            await self.page.route(
-                "**/*",
-                lambda route: (
-                    route.abort()
-                    if (
-                        "join-for-free" in route.request.url
-                        or "promo" in route.request.url
-                        or route.request.resource_type in {"image", "font", "media"}
-                    )
-                    else route.continue_()
-                ),
-            )
+            self.browser = await _get_browser()
+            # Reuse cookies (e.g. an accepted consent banner) from the previous run
+            context = None
+            if OBSERVER_STATE_PATH.exists():
+                try:
+                    context = await self._new_context(str(OBSERVER_STATE_PATH))
+                except Exception as e:
+                    # A truncated or stale file must not block startup; start fresh
+                    logger.warning("Discarding unusable browser state %s: %s", OBSERVER_STATE_PATH, e)
+                    OBSERVER_STATE_PATH.unlink(missing_ok=True)
+            if context is None:
+                context = await self._new_context()
+            self.page = await self._open_page(context)
+            await self._load_page()
+            logger.info("Browser started successfully")
+        except Exception as e:
+            logger.error("Failed to start browser: %s", e)
+            raise
 
-            # Use longer timeout and handle navigation better
-            try:
-                await self.page.goto(self.url, wait_until="domcontentloaded", timeout=60000)
-            except Exception as e:
-                logger.warning("Navigation error (continuing): %s", e)
+    async def _new_context(self, storage_state: Union[str, Dict[str, Any], None] = None) -> BrowserContext:
+        """Create a browser context with the observer's headers and init script."""
+        context = await self.browser.new_context(
+            storage_state=storage_state,
+            user_agent=(
+                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                "AppleWebKit/537.36 (KHTML, like Gecko) "
+                "Chrome/120.0.0.0 Safari/537.36"
+            ),
+            locale="en-US",
+            viewport={"width": 1920, "height": 1080},
+            extra_http_headers={
+                "Accept-Language": "en-US,en;q=0.9",
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            },
+        )
+        # Override navigator.webdriver flag
+        await context.add_init_script(
+            """{
+            Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+        }"""
+        )
+        return context
+
+    async def _open_page(self, context: BrowserContext) -> Page:
+        """Open a page in context with promo and asset requests blocked."""
+        page = await context.new_page()
+        # Block the disruptive promo video and heavy assets inside the browser,
+        # without a Python route callback per request
+        cdp = await context.new_cdp_session(page)
+        await cdp.send("Network.enable")
+        await cdp.send("Network.setBlockedURLs", {"urls": _BLOCKED_URL_PATTERNS})
+        return page
+
+    async def _load_page(self) -> None:
+        """Navigate self.page to the target URL and prepare it for snapshots."""
+        # Use longer timeout and handle navigation better
+        try:
+            await self.page.goto(self.url, wait_until="domcontentloaded", timeout=60000)
+        except Exception as e:
+            logger.warning("Navigation error (continuing): %s", e)
 
-            # Wait a bit for dynamic content to load
-            await self.page.wait_for_timeout(2000)
+        # Wait a bit for dynamic content to load
+        await self.page.wait_for_timeout(2000)
 
-            # Check for and handle cookie consent popup (Yahoo Finance)
-            await self._handle_cookie_consent()
+        # Check for and handle cookie consent popup (Yahoo Finance)
+        await self._handle_cookie_consent()
 
-            # Don't wait for networkidle - modern sites never reach it
-            # Instead, wait for the specific table element to appear
+        # Don't wait for networkidle - modern sites never reach it
+        # Instead, wait for the specific table element to appear
+        try:
+            await self.page.wait_for_selector(self.wait_selector, timeout=30000)
+        except Exception as e:
+            logger.warning("Wait selector timeout: %s. Continuing anyway...", e)
+            # Still try to fall back to table selector
             try:
-                await self.page.wait_for_selector(self.wait_selector, timeout=30000)
-            except Exception as e:
-                logger.warning("Wait selector timeout: %s. Continuing anyway...", e)
-                # Still try to fall back to table selector
-                try:
-                    await self.page.wait_for_selector(self.table_selector, timeout=10000)
-                except Exception as e2:
-                    logger.warning("Table selector also not found: %s. Proceeding with extraction...", e2)
-                    # Take a screenshot for debugging
-                    try:
-                        screenshot_path = f"debug_screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-                        await self.page.screenshot(path=screenshot_path, full_page=True)
-                        logger.info("Screenshot saved to %s", screenshot_path)
-                    except Exception as e3:
-                        logger.error("Failed to take screenshot: %s", e3)
-                    # Log page content for debugging
-                    try:
-                        content = await self.page.content()
-                        logger.info("Page HTML length: %s characters", len(content))
-                        logger.info("Page title: %s", await self.page.title())
-                        # Check if we got an error page or captcha
-                        if "captcha" in content.lower() or "access denied" in content.lower():
-                            logger.error("Page appears to show captcha or access denied message")
-                    except Exception as e4:
-                        logger.error("Failed to get page content: %s", e4)
-            logger.info("Browser started successfully")
-
-            if self.inject_mutation_observer:
-                await self.page.evaluate(
-                    """
-                    () => {
-                        window.__changes = [];
-                        const observer = new MutationObserver(mutations => {
-                            mutations.forEach(m => window.__changes.push(m.type));
+                await self.page.wait_for_selector(self.table_selector, timeout=10000)
+            except Exception as e2:
+                logger.warning("Table selector also not found: %s. Proceeding with extraction...", e2)
+                if _DEBUG:
+                    await self._dump_debug_info()
+
+        if self.inject_mutation_observer:
+            await self.page.evaluate(
+                """
+                (tableSelector) => {
+                    // Record mutation types within the price table only, capped so a
+                    // busy page cannot grow the buffer between snapshots
+                    const MAX_CHANGES = 256;
+                    window.__changes = [];
+                    const table = document.querySelector(tableSelector);
+
+                    // Guard: remove disruptive promo video/overlay whenever it appears
+                    const PROMO_SELECTOR = 'video.video-wH0t6WRN, video[src*="join-for-free"], [class*="join-for-free"]';
+                    const killPromo = () => {
+                        document.querySelectorAll(PROMO_SELECTOR).forEach(node => {
+                            const modal = node.closest('[role="dialog"], .overlay, .popup, [class*="modal"], [class*="overlay"]');
+                            (modal || node).remove();
+                        });
+                    };
+                    const isPromoCandidate = node =>
+                        node.nodeType === Node.ELEMENT_NODE &&
+                        (node.matches('video, [class*="join-for-free"], [class*="overlay"]') ||
+                         node.querySelector(PROMO_SELECTOR) !== null);
+
+                    // One observer for both jobs: it is registered on the table (changes)
+                    // and on body (promo insertions), and gets one record per mutation
+                    const observer = new MutationObserver(mutations => {
+                        let promo = false;
+                        for (const m of mutations) {
+                            if (window.__changes.length < MAX_CHANGES && (!table || table.contains(m.target))) {
+                                window.__changes.push(m.type);
+                            }
+                            if (!promo && m.type === 'childList') {
+                                promo = Array.prototype.some.call(m.addedNodes, isPromoCandidate);
+                            }
+                        }
+                        if (promo) killPromo();
+                    });
+                    if (table) {
+                        observer.observe(table, {
+                            childList: true,
+                            subtree: true,
+                            characterData: true,
+                            attributes: true,
+                            attributeFilter: ['class', 'aria-label', 'data-value'],
                         });
-                        observer.observe(document.body, { childList: true, subtree: true });
-                        window.__observer = observer;
-
-                        // Guard: remove disruptive promo video/overlay whenever it appears
-                        const killPromo = () => {
-                            const targets = document.querySelectorAll(
-                              'video.video-wH0t6WRN, video[src*="join-for-free"], [class*="join-for-free"]'
-                            );
-                            targets.forEach(node => {
-                                const modal = node.closest('[role="dialog"], .overlay, .popup, [class*="modal"], [class*="overlay"]');
-                                (modal || node).remove();
-                            });
-                        };
-                        killPromo();
-                        const promoObserver = new MutationObserver(killPromo);
-                        promoObserver.observe(document.body, { childList: true, subtree: true });
-                        window.__promoObserver = promoObserver;
                     }
-                    """
-                )
+                    observer.observe(document.body, { childList: true, subtree: true });
+                    window.__observer = observer;
+                    killPromo();
+                }
+                """,
+                self.table_selector,
+            )
+
+    async def _dump_debug_info(self) -> None:
+        """Save a viewport screenshot and log page details (OBSERVER_DEBUG=1 only)."""
+        # Take a screenshot for debugging
+        try:
+            screenshot_path = f"debug_screenshot_{time.time_ns()}.jpg"
+            await self.page.screenshot(path=screenshot_path, full_page=False, type="jpeg", quality=60)
+            logger.info("Screenshot saved to %s", screenshot_path)
         except Exception as e:
-            logger.error("Failed to start browser: %s", e)
-            raise
+            logger.error("Failed to take screenshot: %s", e)
+        # Log page content for debugging
+        try:
+            content = await self.page.content()
+            logger.info("Page HTML length: %s characters", len(content))
+            logger.info("Page title: %s", await self.page.title())
+            # Check if we got an error page or captcha
+            if "captcha" in content.lower() or "access denied" in content.lower():
+                logger.error("Page appears to show captcha or access denied message")
+        except Exception as e:
+            logger.error("Failed to get page content: %s", e)
+
+    async def _recycle_context(self) -> None:
+        """Replace the browser context with a fresh one carrying over cookies and storage.
+
+        Long-lived contexts accumulate renderer memory that Playwright never
+        releases; closing the context frees it.
+        """
+        old_context = self.page.context
+        storage_state = await old_context.storage_state()
+        self.page = await self._open_page(await self._new_context(storage_state))
+        try:
+            await old_context.close()
+        except Exception as e:
+            logger.warning("Error closing old browser context: %s", e)
+        await self._load_page()
+        self._reloads_since_recycle = 0
+        logger.info("Browser context recycled")
 
     async def _handle_cookie_consent(self) -> None:
         """Handle cookie consent popup if it appears on page load."""
@@ -168,36 +460,32 @@ class SiteObserver:
             return
 
         try:
-            # Wait briefly for the consent popup to appear
-            # Try multiple possible selectors for the "Accept all" button
-            selectors = [
-                'button[name="agree"][value="agree"]',  # Yahoo Finance specific
-                "button.accept-all",
-                "button.consent_reject_all_2",
-                'button:has-text("Accepter tout")',  # French version
-                'button:has-text("Accept all")',  # English version
-            ]
-
-            for selector in selectors:
+            # Wait up to 3s, in the page, for any known "Accept all" button to appear
+            found = await self.page.evaluate(
+                _FIND_CONSENT_BUTTON_JS,
+                {
+                    "selectors": [
+                        'button[name="agree"][value="agree"]',  # Yahoo Finance specific
+                        "button.accept-all",
+                        "button.consent_reject_all_2",
+                    ],
+                    "labels": ["Accepter tout", "Accept all"],  # French and English versions
+                    "timeoutMs": 3000,
+                },
+            )
+
+            if found:
+                logger.info("Cookie consent popup detected, clicking accept button: %s", found)
+                await self.page.click("[data-observer-consent]", timeout=3000)
+                # Wait a moment for the popup to disappear
+                await self.page.wait_for_timeout(1000)
+                logger.info("Cookie consent accepted successfully")
+                # Persist cookies so the next startup skips the consent popup
                 try:
-                    # Check if the button exists with a short timeout
-                    consent_button = await self.page.wait_for_selector(
-                        selector,
-                        timeout=3000,
-                        state="visible",
-                    )
-
-                    if consent_button:
-                        logger.info("Cookie consent popup detected, clicking accept button: %s", selector)
-                        await consent_button.click()
-                        # Wait a moment for the popup to disappear
-                        await self.page.wait_for_timeout(1000)
-                        logger.info("Cookie consent accepted successfully")
-                        return
-
-                except Exception:
-                    # This selector didn't match, try the next one
-                    continue
+                    await self.page.context.storage_state(path=str(OBSERVER_STATE_PATH))
+                except Exception as e:
+                    logger.warning("Failed to save browser storage state: %s", e)
+                return
 
             logger.debug("No cookie consent popup detected, continuing with normal flow")
 
@@ -213,191 +501,75 @@ class SiteObserver:
             return False
 
         try:
-            # List of common popup selectors to try
-            popup_selectors = [
-                # Generic modal/overlay patterns
-                'div[role="dialog"]',
-                'div[role="alertdialog"]',
-                ".modal",
-                ".popup",
-                ".overlay",
-                "[class*='modal']",
-                "[class*='popup']",
-                "[class*='overlay']",
-                "[class*='dialog']",
-
-                # Specific close button patterns
-                'button[aria-label*="close"]',
-                'button[aria-label*="Close"]',
-                'button[aria-label*="dismiss"]',
-                "button.close",
-                "button.btn-close",
-                "[class*='close-button']",
-                "[class*='dismiss']",
-
-                # ESC key or click on overlay
-                ".backdrop",
-                ".dimmed",
-                "[class*='backdrop']",
-            ]
-
-            for selector in popup_selectors:
-                try:
-                    # Check if element exists and is visible
-                    element = await self.page.query_selector(selector)
-                    if element:
-                        is_visible = await element.is_visible()
-                        if is_visible:
-                            logger.info("Popup detected: %s", selector)
-
-                            # Try to find close button within popup
-                            close_button_selectors = [
-                                'button[aria-label*="close"]',
-                                'button[aria-label*="dismiss"]',
-                                "button.close",
-                                "button.btn-close",
-                                "[class*='close']",
-                                'span[aria-label*="close"]',
-                            ]
-
-                            for close_sel in close_button_selectors:
-                                try:
-                                    close_btn = await element.query_selector(close_sel)
-                                    if close_btn and await close_btn.is_visible():
-                                        logger.info("Found close button: %s, clicking...", close_sel)
-                                        await close_btn.click()
-                                        await self.page.wait_for_timeout(500)
-                                        logger.info("Popup closed successfully")
-                                        return True
-                                except Exception:
-                                    continue
-
-                            # If no close button found, try pressing Escape key
-                            try:
-                                logger.info("No close button found, trying Escape key...")
-                                await self.page.keyboard.press("Escape")
-                                await self.page.wait_for_timeout(500)
-                                logger.info("Escape key pressed")
-                                return True
-                            except Exception as e:
-                                logger.debug("Escape key failed: %s", e)
-
-                            # If still visible, try clicking outside (on backdrop)
-                            try:
-                                logger.info("Trying to click backdrop...")
-                                backdrop = await self.page.query_selector('[class*="backdrop"], .overlay, .dimmed')
-                                if backdrop:
-                                    await backdrop.click()
-                                    await self.page.wait_for_timeout(500)
-                                    logger.info("Backdrop clicked")
-                                    return True
-                            except Exception as e:
-                                logger.debug("Backdrop click failed: %s", e)
-
-                            # Last resort: try removing the element from DOM
-                            try:
-                                logger.info("Removing popup from DOM...")
-                                await self.page.evaluate(
-                                    f"""
-                                    (() => {{
-                                        const elem = document.querySelector('{selector}');
-                                        if (elem) {{
-                                            elem.remove();
-                                            console.log('Popup removed');
-                                        }}
-                                    }})()
-                                """
-                                )
-                                await self.page.wait_for_timeout(500)
-                                logger.info("Popup removed from DOM")
-                                return True
-                            except Exception as e:
-                                logger.debug("DOM removal failed: %s", e)
-
-                except Exception as e:
-                    logger.debug("Error checking selector %s: %s", selector, e)
-                    continue
-
-            return False
+            # Find the first visible popup and click its close button in one round-trip
+            result: Dict[str, Any] = await self.page.evaluate(
+                _CLOSE_POPUP_JS,
+                {"popupSelectors": _POPUP_SELECTORS, "closeSelectors": _POPUP_CLOSE_SELECTORS},
+            )
+            if result["how"] == "none":
+                return False
+
+            logger.info("Popup detected: %s", result["popup"])
+            if result["closed"]:
+                logger.info("Clicked close button: %s", result["how"])
+                await self.page.wait_for_timeout(500)
+                logger.info("Popup closed successfully")
+                return True
+
+            # No close button found; fall back to the Escape key
+            logger.info("No close button found, trying Escape key...")
+            await self.page.keyboard.press("Escape")
+            await self.page.wait_for_timeout(500)
+            logger.info("Escape key pressed")
+            return True
 
         except Exception as e:
             logger.warning("Error in popup detection: %s", e)
             return False
 
     async def shutdown(self) -> None:
-        """Clean up browser resources."""
-        logger.info("Shutting down browser")
+        """Close this observer's browser context; the shared browser stays up.
+
+        Call close_shared_browser() once no observers remain.
+        """
+        logger.info("Shutting down browser context")
         try:
-            if self.browser:
-                await self.browser.close()
+            if self.page:
+                await self.page.context.close()
         except Exception as e:
-            logger.error("Error closing browser: %s", e)
+            logger.error("Error closing browser context: %s", e)
         finally:
-            if self._pw:
-                try:
-                    await self._pw.stop()
-                except Exception as e:
-                    logger.error("Error stopping playwright: %s", e)
+            self.page = None
 
     async def _extract_pair_cells_text(self) -> List[str]:
         if not self.page:
             return []
-        js = f"""
-        (() => {{
-            const table = document.querySelector('{self.table_selector}');
-            if (!table) return [];
-            const cells = table.querySelectorAll('{self.pair_cell_selector}');
-            return Array.from(cells).map(td => td.textContent.trim()).filter(Boolean);
-        }})()
-        """
-        texts: List[str] = await self.page.evaluate(js)
+        texts: List[str] = await self.page.evaluate(
+            _EXTRACT_PAIR_CELLS_JS,
+            {"table": self.table_selector, "pairCell": self.pair_cell_selector},
+        )
         return texts
 
     async def _extract_pairs_with_prices(self) -> List[Dict[str, str]]:
         """Extract currency pairs with their current prices from the table."""
         if not self.page:
             return []
-        js = f"""
-        (() => {{
-            const table = document.querySelector('{self.table_selector}');
-            if (!table) return [];
-            const rows = table.querySelectorAll('tbody tr');
-            return Array.from(rows).map(row => {{
-                const cells = row.querySelectorAll('td');
-                const priceIndex = {self.price_column_index};
-                if (cells.length <= priceIndex) return null;
-
-                // Get pair name from first column that contains .symbol or second column
-                let pairText = '';
-                const symbolEl = cells[0]?.querySelector('.symbol');
-                if (symbolEl) {{
-                    pairText = symbolEl.textContent.trim();
-                }} else {{
-                    pairText = cells[1]?.textContent.trim() || '';
-                }}
-
-                const priceText = cells[priceIndex]?.textContent.trim() || '';
-                // Extract just the price (first number before any +/- change)
-                const priceMatch = priceText.match(/^([\d,\.]+)/);
-                return {{
-                    pair: pairText,
-                    price: priceMatch ? priceMatch[1] : priceText
-                }};
-            }}).filter(item => item && item.pair && item.price);
-        }})()
-        """
-        pairs_data: List[Dict[str, str]] = await self.page.evaluate(js)
+        pairs_data: List[Dict[str, str]] = await self.page.evaluate(
+            _EXTRACT_PAIRS_JS,
+            {"table": self.table_selector, "priceIndex": self.price_column_index},
+        )
         return pairs_data
 
     @staticmethod
     def _parse_majors_from_texts(texts: List[str], majors: List[str]) -> List[str]:
-        majors_set = set(m.upper() for m in majors)
+        majors_set = _majors_set(tuple(majors))
         found = set()
         for txt in texts:
             # Extract 3-letter codes split by common separators
-            tokens = re.split(r"[\s/\-:]+", txt.upper())
+            tokens = _SPLIT_RE.split(txt.upper())
             for tok in tokens:
-                if len(tok) == 3 and tok.isalpha() and tok in majors_set:
+                # isascii is a cheap C check; majors_set membership rejects digits/punctuation
+                if len(tok) == 3 and tok.isascii() and tok in majors_set:
                     found.add(tok)
         return sorted(found)
 
@@ -405,47 +577,21 @@ class SiteObserver:
         if not self.page:
             raise RuntimeError("Observer not started. Call startup() first.")
 
+        # Taken once per snapshot; ts_ns is what gets stored, ts is the display form
+        now_ns = time.time_ns()
         try:
-            # Get all symbol elements from the new TradingView-like structure
-            symbol_elements = await self.page.query_selector_all(".symbol-RsFlttSS")
-            pairs_with_prices = []
-
-            for symbol_elem in symbol_elements:
-                try:
-                    # Extract symbol name
-                    name_elem = await symbol_elem.query_selector(".symbolNameText-RsFlttSS")
-                    if not name_elem:
-                        continue
-
-                    pair = await name_elem.text_content()
-                    pair = pair.strip() if pair else ""
-
-                    if not pair:
-                        continue
-
-                    # Extract price from the last price cell
-                    price_container = await symbol_elem.query_selector(".last-RsFlttSS .inner-RsFlttSS")
-                    if price_container:
-                        price = await price_container.text_content()
-                        # Clean up price - remove any HTML entities and extra whitespace
-                        price = price.strip() if price else "0"
-                        # Handle multi-line prices and normalize
-                        price = re.sub(r"\s+", "", price)  # Remove all whitespace
-                        pairs_with_prices.append({"pair": pair, "price": price})
-                except Exception as e:
-                    logger.debug("Error extracting symbol data: %s", e)
-                    continue
+            # Extract all rows from the TradingView-like structure, plus the page
+            # title and pending mutation records, in one round trip
+            extracted = await self.page.evaluate(_EXTRACT_SYMBOLS_JS)
+            pairs_with_prices = extracted["rows"]
+            title = extracted["title"]
 
             if not pairs_with_prices:
-                try:
-                    title = await self.page.title()
-                    logger.warning(
-                        "Snapshot returned no pairs; page title=%s, url=%s",
-                        title,
-                        self.page.url,
-                    )
-                except Exception:
-                    logger.warning("Snapshot returned no pairs and title fetch failed")
+                logger.warning(
+                    "Snapshot returned no pairs; page title=%s, url=%s",
+                    title,
+                    self.page.url,
+                )
 
             texts = [item["pair"] for item in pairs_with_prices]
             majors_found = self._parse_majors_from_texts(texts, majors)
@@ -460,9 +606,6 @@ class SiteObserver:
                 # If no majors found, include all pairs (for commodities)
                 major_pairs = pairs_with_prices
 
-            title = await self.page.title()
-            changes: List[str] = await self.page.evaluate("() => (window.__changes || []).splice(0)")
-
             # Check if gold price has changed (gold is most volatile, good indicator of live data)
             await self._check_gold_stall(major_pairs)
 
@@ -471,8 +614,9 @@ class SiteObserver:
                 "majors": majors_found if majors_found else texts[:5],  # Include pair samples as "majors" if no majors found
                 "pairs": major_pairs,
                 "pairsSample": texts[:10],
-                "changes": changes,
-                "ts": datetime.now().isoformat(),
+                "changes": extracted["changes"],
+                "ts": _iso_utc(now_ns),
+                "ts_ns": now_ns,
             }
         except Exception as e:
             logger.error("Error getting snapshot: %s", e)
@@ -482,7 +626,8 @@ class SiteObserver:
                 "pairs": [],
                 "pairsSample": [],
                 "changes": [],
-                "ts": datetime.now().isoformat(),
+                "ts": _iso_utc(now_ns),
+                "ts_ns": now_ns,
                 "error": str(e),
             }
 
@@ -495,9 +640,8 @@ class SiteObserver:
         if not self.page:
             return
 
-        import time
-
-        current_time = time.time()
+        # Monotonic clock: stall timing must not jump with wall-clock changes
+        current_time = time.monotonic()
 
         # Determine which pair to monitor based on day of week
         # Monday=0, ..., Friday=4, Saturday=5, Sunday=6
@@ -550,9 +694,13 @@ class SiteObserver:
 
         logger.info("Refreshing page due to stalled gold data...")
         try:
-            await self.page.reload(wait_until="domcontentloaded", timeout=60000)
-            await self.page.wait_for_timeout(2000)
-            await self._handle_cookie_consent()
+            self._reloads_since_recycle += 1
+            if self._reloads_since_recycle >= CONTEXT_RECYCLE_RELOADS:
+                await self._recycle_context()
+            else:
+                await self.page.reload(wait_until="domcontentloaded", timeout=60000)
+                await self.page.wait_for_timeout(2000)
+                await self._handle_cookie_consent()
             # Reset gold tracking after recovery
             self._last_gold_price = None
             self._last_gold_update_time = None
@@ -562,8 +710,8 @@ class SiteObserver:
 
 
 async def observe_once_from_config(config_path: str) -> Dict[str, Any]:
-    with open(config_path, "r", encoding="utf-8") as f:
-        cfg = json.load(f)
+    with open(config_path, "rb") as f:
+        cfg = orjson.loads(f.read())
 
     observer = SiteObserver(
         url=cfg.get("url", "https://example.com"),
@@ -585,7 +733,10 @@ if __name__ == "__main__":
     # Quick manual test: prints a single snapshot
 
     async def _main():
-        data = await observe_once_from_config(str(CONFIG_PATH))
-        print(json.dumps(data, indent=2))
+        try:
+            data = await observe_once_from_config(str(CONFIG_PATH))
+        finally:
+            await close_shared_browser()
+        print(orjson.dumps(data, option=orjson.OPT_INDENT_2).decode())
 
     asyncio.run(_main())
@@ -3,11 +3,15 @@ Price history storage and management for replay functionality - PostgreSQL versi
 Stores price snapshots with timestamps in database.
 """
 import logging
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
 from contextlib import contextmanager
+from itertools import islice
 
-from sqlalchemy import and_
+import orjson
+from sqlalchemy import and_, func, select, text
 from sqlalchemy.orm import Session
 
 from app.db.database import SessionLocal
@@ -19,13 +23,29 @@ logger = logging.getLogger(__name__)
 class PriceHistory:
     """Manages historical price data for replay in PostgreSQL using session-per-operation pattern."""
 
-    def __init__(self):
-        """Initialize price history manager. No persistent session stored."""
-        pass
+    def __init__(self, max_recent: int = 86400):
+        """Initialize price history manager. No persistent session stored.
+
+        The most recent max_recent snapshots are also kept in an in-memory ring
+        buffer so recent-history reads do not hit the database. Entries are
+        (iso timestamp, orjson-encoded snapshot) so each costs one bytes object
+        rather than a tree of dicts; they are decoded only when read.
+        """
+        self._recent: deque = deque(maxlen=max_recent)
+        # add_snapshot runs on a worker thread while API reads run on the event loop
+        self._recent_lock = threading.Lock()
 
     @contextmanager
-    def _get_session(self):
-        """Context manager for database sessions with automatic cleanup and rollback on error."""
+    def _get_session(self, db: Optional[Session] = None):
+        """Context manager for database sessions with automatic cleanup and rollback on error.
+
+        If a session is passed in (e.g. a request-scoped one from get_db), it is
+        reused as-is and its lifecycle is left to the caller.
+        """
+        if db is not None:
+            yield db
+            return
+
         db = SessionLocal()
         try:
             yield db
@@ -41,25 +61,24 @@ class PriceHistory:
     def history(self) -> List[Dict[str, Any]]:
         """Get all historical snapshots for compatibility."""
         with self._get_session() as db:
-            records = db.query(PriceHistoryModel).order_by(PriceHistoryModel.timestamp).all()
-            return [self._to_dict(r) for r in records]
+            stmt = (
+                select(PriceHistoryModel.timestamp, PriceHistoryModel.snapshot)
+                .order_by(PriceHistoryModel.timestamp)
+                .execution_options(yield_per=10000)
+            )
+            return [self._to_dict(row._mapping) for row in db.execute(stmt)]
 
     def add_snapshot(self, snapshot: Dict[str, Any]) -> None:
-        """Add a price snapshot with timestamp."""
-        with self._get_session() as db:
-            timestamp = snapshot.get("ts")
-            if not timestamp:
-                timestamp = datetime.utcnow().isoformat()
-            elif isinstance(timestamp, str):
-                try:
-                    timestamp = datetime.fromisoformat(timestamp)
-                except (ValueError, TypeError):
-                    timestamp = datetime.utcnow()
-            else:
-                timestamp = datetime.utcnow()
+        """Add a price snapshot with timestamp.
 
-            # Remove 'ts' field from snapshot data
-            snapshot_copy = {k: v for k, v in snapshot.items() if k != "ts"}
+        The time comes from snapshot["ts_ns"] (epoch nanoseconds, as set by the
+        observer) when present, else snapshot["ts"], which may also be a
+        datetime or an ISO string.
+        """
+        timestamp = self._coerce_timestamp(snapshot.get("ts_ns", snapshot.get("ts")))
+        with self._get_session() as db:
+            # Remove timestamp fields from snapshot data
+            snapshot_copy = {k: v for k, v in snapshot.items() if k not in ("ts", "ts_ns")}
 
             historical_entry = PriceHistoryModel(
                 timestamp=timestamp,
@@ -68,85 +87,207 @@ class PriceHistory:
             db.add(historical_entry)
             logger.debug("Added price history snapshot at %s", timestamp)
 
+        with self._recent_lock:
+            self._recent.append((timestamp.isoformat(), orjson.dumps(snapshot_copy)))
+
+    def get_recent(self, limit: int, db: Optional[Session] = None) -> List[Dict[str, Any]]:
+        """Get the latest `limit` snapshots, oldest first.
+
+        Served from the ring buffer when it holds enough entries, otherwise from
+        the database.
+        """
+        if limit <= 0:
+            return []
+
+        recent = None
+        with self._recent_lock:
+            if limit <= len(self._recent):
+                recent = list(islice(reversed(self._recent), limit))
+        if recent:
+            recent.reverse()
+            return [{"timestamp": ts, "snapshot": orjson.loads(blob)} for ts, blob in recent]
+
+        with self._get_session(db) as db:
+            rows = db.execute(
+                select(PriceHistoryModel.timestamp, PriceHistoryModel.snapshot)
+                .order_by(PriceHistoryModel.timestamp.desc())
+                .limit(limit)
+            ).all()
+            return [self._to_dict(row._mapping) for row in reversed(rows)]
+
     def get_history_range(
-        self, start_time: Optional[str] = None, end_time: Optional[str] = None
+        self,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        db: Optional[Session] = None,
     ) -> List[Dict[str, Any]]:
         """Get historical snapshots within a time range."""
-        with self._get_session() as db:
-            query = db.query(PriceHistoryModel)
+        with self._get_session(db) as db:
+            stmt = select(PriceHistoryModel.timestamp, PriceHistoryModel.snapshot)
 
             if start_time:
                 try:
                     start_dt = datetime.fromisoformat(start_time)
-                    query = query.filter(PriceHistoryModel.timestamp >= start_dt)
+                    stmt = stmt.where(PriceHistoryModel.timestamp >= start_dt)
                 except ValueError:
                     logger.warning("Invalid start_time format: %s", start_time)
 
             if end_time:
                 try:
                     end_dt = datetime.fromisoformat(end_time)
-                    query = query.filter(PriceHistoryModel.timestamp <= end_dt)
+                    stmt = stmt.where(PriceHistoryModel.timestamp <= end_dt)
                 except ValueError:
                     logger.warning("Invalid end_time format: %s", end_time)
 
-            records = query.order_by(PriceHistoryModel.timestamp).all()
-            return [self._to_dict(r) for r in records]
+            stmt = stmt.order_by(PriceHistoryModel.timestamp).execution_options(yield_per=10000)
+            return [self._to_dict(row._mapping) for row in db.execute(stmt)]
+
+    def iter_range_rows(
+        self,
+        start_ts: Optional[datetime] = None,
+        end_ts: Optional[datetime] = None,
+        db: Optional[Session] = None,
+    ) -> Iterator[Tuple[datetime, Dict[str, Any]]]:
+        """Stream (timestamp, snapshot) rows in [start_ts, end_ts) from a single query.
+
+        Uses a Core select so rows skip ORM instance construction.
+        """
+        with self._get_session(db) as db:
+            stmt = select(PriceHistoryModel.timestamp, PriceHistoryModel.snapshot)
+            if start_ts:
+                stmt = stmt.where(PriceHistoryModel.timestamp >= start_ts)
+            if end_ts:
+                stmt = stmt.where(PriceHistoryModel.timestamp < end_ts)
+            stmt = stmt.order_by(PriceHistoryModel.timestamp).execution_options(yield_per=10000)
 
-    def get_snapshot_at_index(self, index: int) -> Optional[Dict[str, Any]]:
+            for row in db.execute(stmt):
+                mapping = row._mapping
+                yield mapping["timestamp"], mapping["snapshot"]
+
+    def get_symbol_series(
+        self,
+        symbol: str,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        db: Optional[Session] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get (timestamp, price) points for one symbol without fetching whole snapshots."""
+        conditions = ["ph.snapshot -> 'pairs' @> CAST(:probe AS jsonb)"]
+        params: Dict[str, Any] = {"symbol": symbol, "probe": orjson.dumps([{"pair": symbol}]).decode()}
+
+        if start_time:
+            try:
+                params["start"] = datetime.fromisoformat(start_time)
+                conditions.append("ph.timestamp >= :start")
+            except ValueError:
+                logger.warning("Invalid start_time format: %s", start_time)
+
+        if end_time:
+            try:
+                params["end"] = datetime.fromisoformat(end_time)
+                conditions.append("ph.timestamp <= :end")
+            except ValueError:
+                logger.warning("Invalid end_time format: %s", end_time)
+
+        stmt = text(
+            "SELECT ph.timestamp, elem ->> 'price' AS price "
+            "FROM price_history ph, jsonb_array_elements(ph.snapshot -> 'pairs') AS elem "
+            f"WHERE {' AND '.join(conditions)} AND elem ->> 'pair' = :symbol "
+            "ORDER BY ph.timestamp"
+        )
+        with self._get_session(db) as db:
+            return [
+                {
+                    "timestamp": row.timestamp.isoformat() if row.timestamp else None,
+                    "price": row.price,
+                }
+                for row in db.execute(stmt, params)
+            ]
+
+    def get_snapshot_at_index(self, index: int, db: Optional[Session] = None) -> Optional[Dict[str, Any]]:
         """Get snapshot at specific index."""
-        with self._get_session() as db:
-            records = db.query(PriceHistoryModel).order_by(PriceHistoryModel.timestamp).all()
-            if 0 <= index < len(records):
-                return self._to_dict(records[index])
+        if index < 0:
             return None
+        with self._get_session(db) as db:
+            row = db.execute(
+                select(PriceHistoryModel.timestamp, PriceHistoryModel.snapshot)
+                .order_by(PriceHistoryModel.timestamp)
+                .offset(index)
+                .limit(1)
+            ).first()
+            return self._to_dict(row._mapping) if row else None
 
-    def get_latest_snapshot(self) -> Optional[Dict[str, Any]]:
+    def get_latest_snapshot(self, db: Optional[Session] = None) -> Optional[Dict[str, Any]]:
         """Get the most recent snapshot."""
-        with self._get_session() as db:
-            record = (
-                db.query(PriceHistoryModel)
+        with self._get_session(db) as db:
+            row = db.execute(
+                select(PriceHistoryModel.timestamp, PriceHistoryModel.snapshot)
                 .order_by(PriceHistoryModel.timestamp.desc())
-                .first()
-            )
-            return self._to_dict(record) if record else None
+                .limit(1)
+            ).first()
+            return self._to_dict(row._mapping) if row else None
 
-    def get_snapshot_count(self) -> int:
-        """Get total number of snapshots."""
-        with self._get_session() as db:
-            return db.query(PriceHistoryModel).count()
+    def get_snapshot_count(self, db: Optional[Session] = None) -> int:
+        """Get total number of snapshots from the trigger-maintained counter row."""
+        with self._get_session(db) as db:
+            count = db.execute(text("SELECT n FROM price_history_stats WHERE id = 1")).scalar()
+            if count is None:
+                # Counter row not seeded yet (e.g. tables created outside init_db)
+                return db.query(PriceHistoryModel).count()
+            return count
 
     def clear_history(self) -> None:
         """Clear all history (use with caution)."""
         with self._get_session() as db:
             logger.warning("Clearing all price history")
-            db.query(PriceHistoryModel).delete()
+            db.execute(text("TRUNCATE TABLE price_history RESTART IDENTITY"))
+            # TRUNCATE does not fire the row-level counter trigger
+            db.execute(text("UPDATE price_history_stats SET n = 0"))
+        with self._recent_lock:
+            self._recent.clear()
 
-    def get_date_range(self) -> Optional[Dict[str, str]]:
+    def get_date_range(self, db: Optional[Session] = None) -> Optional[Dict[str, str]]:
         """Get earliest and latest timestamp in history."""
-        with self._get_session() as db:
-            records = (
-                db.query(PriceHistoryModel)
-                .order_by(PriceHistoryModel.timestamp)
-                .all()
-            )
+        with self._get_session(db) as db:
+            earliest, latest = db.execute(
+                select(
+                    func.min(PriceHistoryModel.timestamp),
+                    func.max(PriceHistoryModel.timestamp),
+                )
+            ).one()
 
-            if not records:
+            if earliest is None:
                 return None
 
-            earliest = records[0].timestamp
-            latest = records[-1].timestamp
-
             return {
                 "earliest": earliest.isoformat() if earliest else None,
                 "latest": latest.isoformat() if latest else None,
             }
 
     @staticmethod
-    def _to_dict(record: PriceHistoryModel) -> Dict[str, Any]:
-        """Convert ORM model to dictionary."""
-        if not record:
+    def _coerce_timestamp(value: Any) -> datetime:
+        """Convert a snapshot timestamp to an aware datetime, defaulting to now (UTC).
+
+        Naive datetimes are taken as UTC rather than left to the session time zone.
+        """
+        if isinstance(value, int):
+            return datetime.fromtimestamp(value / 1e9, tz=timezone.utc)
+        if isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                logger.warning("Invalid snapshot timestamp: %s", value)
+        if isinstance(value, datetime):
+            return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc)
+
+    @staticmethod
+    def _to_dict(row: Mapping[str, Any]) -> Dict[str, Any]:
+        """Convert a (timestamp, snapshot) row mapping to dictionary."""
+        if not row:
             return None
+        timestamp = row["timestamp"]
         return {
-            "timestamp": record.timestamp.isoformat() if record.timestamp else None,
-            "snapshot": record.snapshot,
+            "timestamp": timestamp.isoformat() if timestamp else None,
+            "snapshot": row["snapshot"],
         }
@@ -3,8 +3,9 @@ Replay manager for controlling price data playback.
 Handles pause, resume, speed control, and playback status.
 """
 import logging
+from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +18,20 @@ class ReplayState(Enum):
     PAUSED = "paused"
 
 
+def advance(current_index: int, accum: float, speed: float, end: int) -> Tuple[int, float, int]:
+    """Advance the replay cursor by one tick.
+
+    Returns (new_index, new_accum, row_index), where row_index is the snapshot to
+    play this tick or -1 once the end is reached. Fractional speed carries over
+    in accum, so speed < 1 holds a snapshot for several ticks.
+    """
+    if current_index >= end:
+        return current_index, accum, -1
+    accum += speed
+    step = int(accum)
+    return current_index + step, accum - step, current_index
+
+
 class ReplayManager:
     """Manages price data replay with speed and timeline control."""
 
@@ -25,25 +40,68 @@ class ReplayManager:
         self.current_index: int = 0
         self.total_snapshots: int = 0
         self.speed: float = 1.0  # 0.5x, 1x, 2x, 4x, etc.
+        self._accum: float = 0.0  # Fractional progress carried between ticks
         self.start_index: int = 0
         self.end_index: Optional[int] = None
-        self.snapshots: list = []
+        # Columnar storage: timestamps[i] belongs to snapshots[i]
+        self.timestamps: List[Optional[str]] = []
+        self.snapshots: List[Dict[str, Any]] = []
+
+    def load_from_history(
+        self,
+        price_history,
+        start_ts: Optional[datetime] = None,
+        end_ts: Optional[datetime] = None,
+        db=None,
+    ) -> Tuple[List[Optional[str]], List[Dict[str, Any]]]:
+        """Load snapshots in [start_ts, end_ts) from price history in one query.
+
+        Returns (timestamps, snapshots) without touching the replay state; pass
+        them to start_replay(columns=...) to play them.
+        """
+        timestamps: List[Optional[str]] = []
+        snapshots: List[Dict[str, Any]] = []
+        for ts, snapshot in price_history.iter_range_rows(start_ts, end_ts, db=db):
+            timestamps.append(ts.isoformat() if ts else None)
+            snapshots.append(snapshot)
+
+        logger.info("Loaded %s snapshots for replay", len(snapshots))
+        return timestamps, snapshots
 
     def start_replay(
         self,
-        snapshots: list,
+        snapshots: Optional[list] = None,
         start_index: int = 0,
         speed: float = 1.0,
+        columns: Optional[Tuple[List[Optional[str]], List[Dict[str, Any]]]] = None,
     ) -> Dict[str, Any]:
-        """Start replay from a specific index."""
-        if not snapshots:
+        """Start replay from a specific index.
+
+        Data comes from columns=(timestamps, snapshots) as returned by
+        load_from_history(), or from a list of {"timestamp", "snapshot"} dicts.
+        If neither is given, the previously loaded data is replayed. Nothing is
+        replaced unless the data is non-empty and start_index is valid.
+        """
+        if columns is not None:
+            timestamps, rows = columns
+        elif snapshots is not None:
+            timestamps = [s.get("timestamp") for s in snapshots]
+            rows = [s.get("snapshot") for s in snapshots]
+        else:
+            timestamps, rows = self.timestamps, self.snapshots
+
+        if not rows:
             raise ValueError("No snapshots provided")
+        if not (0 <= start_index < len(rows)):
+            raise ValueError(f"Invalid start_index. Must be 0-{len(rows) - 1}")
 
-        self.snapshots = snapshots
-        self.total_snapshots = len(snapshots)
+        self.timestamps = timestamps
+        self.snapshots = rows
+        self.total_snapshots = len(rows)
         self.current_index = start_index
+        self._accum = 0.0
         self.start_index = start_index
-        self.end_index = len(snapshots)
+        self.end_index = self.total_snapshots
         self.speed = max(0.25, min(speed, 4.0))  # Clamp between 0.25x and 4x
         self.state = ReplayState.PLAYING
 
@@ -74,6 +132,7 @@ class ReplayManager:
         """Stop replay completely."""
         self.state = ReplayState.STOPPED
         self.current_index = 0
+        self._accum = 0.0
         logger.info("Replay stopped")
         return self.get_status()
 
@@ -87,6 +146,7 @@ class ReplayManager:
         """Seek to specific snapshot index."""
         if 0 <= index < self.total_snapshots:
             self.current_index = index
+            self._accum = 0.0
             logger.info("Seek to snapshot %s/%s", index, self.total_snapshots)
         return self.get_status()
 
@@ -95,27 +155,49 @@ class ReplayManager:
         if self.total_snapshots > 0:
             index = int((percentage / 100) * self.total_snapshots)
             self.current_index = min(index, self.total_snapshots - 1)
+            self._accum = 0.0
             logger.info("Seek to %s%% (snapshot %s)", percentage, self.current_index)
         return self.get_status()
 
-    def get_next_snapshot(self) -> Optional[Dict[str, Any]]:
-        """Get next snapshot and advance index based on speed."""
+    def _next_index(self) -> Optional[int]:
+        """Return the index of the next snapshot to play and advance based on speed."""
         if self.state != ReplayState.PLAYING or not self.snapshots:
             return None
 
-        if self.current_index >= self.total_snapshots:
+        # Advance based on speed (1x = 1 snapshot per call)
+        # speed > 1 = skip ahead faster
+        # speed < 1 = interpolate (stay on same for multiple calls)
+        self.current_index, self._accum, index = advance(
+            self.current_index, self._accum, self.speed, self.total_snapshots
+        )
+        if index < 0:
             # End of replay
             self.state = ReplayState.STOPPED
             return None
 
-        snapshot = self.snapshots[self.current_index]
+        return index
 
-        # Advance based on speed (1x = 1 snapshot per call)
-        # speed > 1 = skip ahead faster
-        # speed < 1 = interpolate (stay on same for multiple calls)
-        self.current_index += max(1, int(self.speed))
+    def get_next_snapshot(self) -> Optional[Dict[str, Any]]:
+        """Get next snapshot and advance index based on speed."""
+        index = self._next_index()
+        if index is None:
+            return None
+        return {
+            "timestamp": self.timestamps[index],
+            "snapshot": self.snapshots[index],
+        }
 
-        return snapshot
+    def iter_snapshots(self) -> Iterator[Tuple[Optional[str], Dict[str, Any]]]:
+        """Yield (timestamp, snapshot) ticks straight from the columnar arrays.
+
+        The generator ends when replay stops or reaches the end. Pause, seek and
+        speed changes take effect on the next tick.
+        """
+        while True:
+            index = self._next_index()
+            if index is None:
+                return
+            yield self.timestamps[index], self.snapshots[index]
 
     def get_status(self) -> Dict[str, Any]:
         """Get current replay status."""
@@ -3,6 +3,7 @@ SMS notification service using Africa's Talking.
 """
 import logging
 import os
+from typing import Any, Dict, List
 
 import africastalking
 
@@ -28,22 +29,52 @@ class SMSService:
         custom_message: str = "",
     ) -> bool:
         """Send price alert SMS."""
-        try:
-            msg_lines = [
-                f"ALERT: {pair} {condition} {target_price}",
-                f"Current: {current_price}",
-            ]
-            if custom_message:
-                msg_lines.append(custom_message)
-            msg = " | ".join(msg_lines)
+        msg = self._build_message(pair, target_price, current_price, condition, custom_message)
+        return self._send(msg, [to_phone])
+
+    def send_batch(self, alerts: List[Dict[str, Any]]) -> bool:
+        """Send several price alert SMS, one API call per distinct message text.
+
+        Each entry holds the send_price_alert keyword arguments. Alerts that
+        render to the same text share one call with all their recipients.
+        """
+        recipients_by_msg: Dict[str, List[str]] = {}
+        for alert in alerts:
+            msg = self._build_message(
+                alert["pair"],
+                alert["target_price"],
+                alert["current_price"],
+                alert["condition"],
+                alert.get("custom_message", ""),
+            )
+            recipients = recipients_by_msg.setdefault(msg, [])
+            if alert["to_phone"] not in recipients:
+                recipients.append(alert["to_phone"])
 
+        ok = True
+        for msg, recipients in recipients_by_msg.items():
+            ok = self._send(msg, recipients) and ok
+        return ok
+
+    @staticmethod
+    def _build_message(pair, target_price, current_price, condition, custom_message="") -> str:
+        msg_lines = [
+            f"ALERT: {pair} {condition} {target_price}",
+            f"Current: {current_price}",
+        ]
+        if custom_message:
+            msg_lines.append(custom_message)
+        return " | ".join(msg_lines)
+
+    def _send(self, msg: str, recipients: List[str]) -> bool:
+        try:
             params = {}
             if self.sender_id:
                 params["from_"] = self.sender_id
 
-            response = self.sms.send(msg, [to_phone], **params)
-            logger.info("SMS sent to %s: %s", to_phone, response)
+            response = self.sms.send(msg, recipients, **params)
+            logger.info("SMS sent to %s: %s", ", ".join(recipients), response)
             return True
         except Exception as e:
-            logger.error("Failed to send SMS to %s: %s", to_phone, e)
+            logger.error("Failed to send SMS to %s: %s", ", ".join(recipients), e)
             return False
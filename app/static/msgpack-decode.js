@@ -0,0 +1,80 @@
+// Minimal MessagePack decoder for the WebSocket frames sent with wsEncoding
+// "msgpack". Served from this app so the dashboard loads no third-party code.
+// Covers every type msgpack.packb(use_bin_type=True) emits; ext types are
+// rejected because the server never sends them.
+
+const textDecoder = new TextDecoder();
+
+export function decode(bytes) {
+  const buf = bytes instanceof Uint8Array ? bytes : new Uint8Array(bytes);
+  const view = new DataView(buf.buffer, buf.byteOffset, buf.byteLength);
+  let pos = 0;
+
+  const str = (len) => {
+    const value = textDecoder.decode(buf.subarray(pos, pos + len));
+    pos += len;
+    return value;
+  };
+  const bin = (len) => {
+    const value = buf.slice(pos, pos + len);
+    pos += len;
+    return value;
+  };
+  const array = (len) => {
+    const value = new Array(len);
+    for (let i = 0; i < len; i++) value[i] = read();
+    return value;
+  };
+  const map = (len) => {
+    const value = {};
+    for (let i = 0; i < len; i++) {
+      const key = read();
+      value[key] = read();
+    }
+    return value;
+  };
+
+  function read() {
+    if (pos >= buf.length) throw new RangeError('msgpack: unexpected end of data');
+    const type = buf[pos++];
+    let value;
+
+    if (type <= 0x7f) return type;
+    if (type <= 0x8f) return map(type & 0x0f);
+    if (type <= 0x9f) return array(type & 0x0f);
+    if (type <= 0xbf) return str(type & 0x1f);
+    if (type >= 0xe0) return type - 0x100;
+
+    switch (type) {
+      case 0xc0: return null;
+      case 0xc2: return false;
+      case 0xc3: return true;
+      case 0xc4: value = view.getUint8(pos); pos += 1; return bin(value);
+      case 0xc5: value = view.getUint16(pos); pos += 2; return bin(value);
+      case 0xc6: value = view.getUint32(pos); pos += 4; return bin(value);
+      case 0xca: value = view.getFloat32(pos); pos += 4; return value;
+      case 0xcb: value = view.getFloat64(pos); pos += 8; return value;
+      case 0xcc: value = view.getUint8(pos); pos += 1; return value;
+      case 0xcd: value = view.getUint16(pos); pos += 2; return value;
+      case 0xce: value = view.getUint32(pos); pos += 4; return value;
+      case 0xcf: value = Number(view.getBigUint64(pos)); pos += 8; return value;
+      case 0xd0: value = view.getInt8(pos); pos += 1; return value;
+      case 0xd1: value = view.getInt16(pos); pos += 2; return value;
+      case 0xd2: value = view.getInt32(pos); pos += 4; return value;
+      case 0xd3: value = Number(view.getBigInt64(pos)); pos += 8; return value;
+      case 0xd9: value = view.getUint8(pos); pos += 1; return str(value);
+      case 0xda: value = view.getUint16(pos); pos += 2; return str(value);
+      case 0xdb: value = view.getUint32(pos); pos += 4; return str(value);
+      case 0xdc: value = view.getUint16(pos); pos += 2; return array(value);
+      case 0xdd: value = view.getUint32(pos); pos += 4; return array(value);
+      case 0xde: value = view.getUint16(pos); pos += 2; return map(value);
+      case 0xdf: value = view.getUint32(pos); pos += 4; return map(value);
+      default:
+        throw new TypeError(`msgpack: unsupported type 0x${type.toString(16)}`);
+    }
+  }
+
+  const result = read();
+  if (pos !== buf.length) throw new RangeError('msgpack: trailing bytes after value');
+  return result;
+}
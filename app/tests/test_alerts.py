@@ -0,0 +1,133 @@
+"""
+Tests for AlertManager.check_alerts threshold matching.
+"""
+import uuid
+
+import pytest
+
+from app.services.alerts import AlertManager
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    """AlertManager with an in-memory index and no database access."""
+    mgr = AlertManager()
+    mgr._by_status = {"active": {}, "triggered": {}}
+
+    def trigger_alert(alert_id, current_price):
+        if alert_id not in mgr._by_status["active"]:
+            return False
+        alert = dict(mgr._by_status["active"][alert_id], status="triggered", last_checked_price=current_price)
+        mgr._index_alert(alert_id, alert)
+        return True
+
+    monkeypatch.setattr(mgr, "trigger_alert", trigger_alert)
+    return mgr
+
+
+def add_alert(mgr, pair, condition, target_price):
+    alert = {
+        "id": str(uuid.uuid4()),
+        "pair": pair,
+        "target_price": target_price,
+        "condition": condition,
+        "status": "active",
+        "channels": [],
+    }
+    mgr._index_alert(alert["id"], alert)
+    return alert
+
+
+def tick(pair, price):
+    return [{"pair": pair, "price": price}]
+
+
+def triggered_ids(results):
+    return {item["alert"]["id"] for item in results}
+
+
+def test_above_triggers_at_exact_target(manager):
+    alert = add_alert(manager, "SPX", "above", 5000.0)
+
+    results = manager.check_alerts(tick("SPX", "5,000.00"))
+
+    assert triggered_ids(results) == {alert["id"]}
+    assert results[0]["current_price"] == 5000.0
+
+
+def test_below_triggers_at_exact_target(manager):
+    alert = add_alert(manager, "SPX", "below", 5000.0)
+
+    assert triggered_ids(manager.check_alerts(tick("SPX", "5000"))) == {alert["id"]}
+
+
+def test_thresholds_not_crossed_do_not_trigger(manager):
+    add_alert(manager, "SPX", "above", 5000.0)
+    add_alert(manager, "SPX", "below", 4900.0)
+
+    assert manager.check_alerts(tick("SPX", "4950")) == []
+    assert len(manager.get_active_alerts()) == 2
+
+
+def test_only_crossed_above_targets_trigger(manager):
+    low = add_alert(manager, "TSLA", "above", 100.0)
+    mid = add_alert(manager, "TSLA", "above", 110.0)
+    add_alert(manager, "TSLA", "above", 120.0)
+
+    assert triggered_ids(manager.check_alerts(tick("TSLA", "110"))) == {low["id"], mid["id"]}
+
+
+def test_only_crossed_below_targets_trigger(manager):
+    add_alert(manager, "TSLA", "below", 100.0)
+    mid = add_alert(manager, "TSLA", "below", 110.0)
+    high = add_alert(manager, "TSLA", "below", 120.0)
+
+    assert triggered_ids(manager.check_alerts(tick("TSLA", "110"))) == {mid["id"], high["id"]}
+
+
+def test_equal_triggers_within_tolerance(manager):
+    # BTCUSD tolerance is ±50
+    alert = add_alert(manager, "BTCUSD", "equal", 60000.0)
+
+    assert manager.check_alerts(tick("BTCUSD", "60050.5")) == []
+    assert triggered_ids(manager.check_alerts(tick("BTCUSD", "60050"))) == {alert["id"]}
+
+
+def test_equal_with_zero_tolerance_needs_exact_price(manager):
+    alert = add_alert(manager, "GOLD", "equal", 2350.5)
+
+    assert manager.check_alerts(tick("GOLD", "2,350.4")) == []
+    assert triggered_ids(manager.check_alerts(tick("GOLD", "2,350.50"))) == {alert["id"]}
+
+
+def test_triggered_alert_leaves_index_and_does_not_fire_again(manager):
+    alert = add_alert(manager, "SPX", "above", 5000.0)
+
+    assert triggered_ids(manager.check_alerts(tick("SPX", "5001"))) == {alert["id"]}
+    assert manager.check_alerts(tick("SPX", "5002")) == []
+
+    by_status = manager.get_alerts_by_status()
+    assert by_status["active"] == []
+    assert [a["id"] for a in by_status["triggered"]] == [alert["id"]]
+
+
+def test_alert_removed_before_trigger_is_not_reported(manager, monkeypatch):
+    deleted = add_alert(manager, "SPX", "above", 4900.0)
+    kept = add_alert(manager, "SPX", "above", 5000.0)
+    trigger_alert = manager.trigger_alert
+
+    # Simulate a concurrent delete between the threshold lookup and the update
+    def delete_then_trigger(alert_id, current_price):
+        if alert_id == deleted["id"]:
+            manager._index_alert(alert_id, None)
+        return trigger_alert(alert_id, current_price)
+
+    monkeypatch.setattr(manager, "trigger_alert", delete_then_trigger)
+
+    assert triggered_ids(manager.check_alerts(tick("SPX", "5000"))) == {kept["id"]}
+
+
+def test_other_pairs_are_ignored(manager):
+    add_alert(manager, "SPX", "above", 5000.0)
+
+    assert manager.check_alerts(tick("DJI", "50000")) == []
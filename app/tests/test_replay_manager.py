@@ -0,0 +1,56 @@
+"""
+Tests for replay cursor stepping.
+"""
+from app.services.replay_manager import ReplayManager, advance
+
+
+def play(speed, end, ticks, start=0):
+    """Run advance() for a number of ticks and return the row played on each."""
+    index, accum = start, 0.0
+    rows = []
+    for _ in range(ticks):
+        index, accum, row = advance(index, accum, speed, end)
+        rows.append(row)
+    return rows
+
+
+def test_normal_speed_plays_every_row():
+    assert play(1.0, end=3, ticks=4) == [0, 1, 2, -1]
+
+
+def test_double_speed_skips_every_other_row():
+    assert play(2.0, end=6, ticks=4) == [0, 2, 4, -1]
+
+
+def test_half_speed_holds_each_row_for_two_ticks():
+    assert play(0.5, end=2, ticks=5) == [0, 0, 1, 1, -1]
+
+
+def test_quarter_speed_holds_each_row_for_four_ticks():
+    assert play(0.25, end=2, ticks=9) == [0, 0, 0, 0, 1, 1, 1, 1, -1]
+
+
+def test_fractional_speed_carries_remainder():
+    # 1.5x alternates between steps of 1 and 2
+    assert play(1.5, end=10, ticks=4) == [0, 1, 3, 4]
+
+
+def test_end_reached_leaves_cursor_unchanged():
+    assert advance(5, 0.25, 1.0, 5) == (5, 0.25, -1)
+
+
+def test_start_index_is_played_first():
+    assert play(1.0, end=5, ticks=3, start=3) == [3, 4, -1]
+
+
+def test_iter_snapshots_follows_speed_and_stops_at_end():
+    manager = ReplayManager()
+    manager.start_replay(
+        columns=(["t0", "t1", "t2"], [{"n": 0}, {"n": 1}, {"n": 2}]),
+        speed=0.5,
+    )
+
+    ticks = list(manager.iter_snapshots())
+
+    assert [ts for ts, _ in ticks] == ["t0", "t0", "t1", "t1", "t2", "t2"]
+    assert not manager.is_replaying()